@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+'''Times parsing, energy transformation and rendering of synthetic .BAND/.DOSS files separately, with their peak
+Python memory, and compares the results with a stored JSON baseline.'''
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import msrhpc
+from msrhpc import plotting
+from synthetic import write_band, write_doss
+
+# (name, bands, k-points, projections, DoS energy points)
+cases = [
+    ('small', 8, 201, 3, 301),
+    ('wide', 500, 401, 20, 2001),
+    ('dense', 20, 100001, 5, 100001),
+]
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def measure(function, repeats=3):
+    '''Runs function once under tracemalloc for the peak memory in MB allocated through Python (including numpy arrays),
+    then repeats times untraced for the fastest wall time in seconds, as tracing slows every allocation down.
+    Returns the time and the peak memory.'''
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    times = []
+
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times), peak
+
+
+def benchmark_case(directory, name, nbands, nkpoints, nprojections, nenergies, repeats=3):
+    'Writes the files of one case into directory and returns {stage: {time, peak_mb}} for every stage.'
+
+    band = os.path.join(directory, name + '.BAND')
+    doss = os.path.join(directory, name + '.DOSS')
+    write_band(band, nbands, nkpoints)
+    write_doss(doss, nprojections, nenergies)
+
+    bsfile = msrhpc.BandFile(band, cache=False)
+    dosfile = msrhpc.DosFile(doss, cache=False)
+
+    # Writes the caches read by the parse_cached stage
+    msrhpc.BandFile(band)
+    msrhpc.DosFile(doss)
+
+    def transform():
+        msrhpc.convert_energies(bsfile.points[1:], bsfile.efermi, True, True)
+        msrhpc.convert_energies(dosfile.points[0], dosfile.efermi, True, True)
+        msrhpc.bands_in_window(bsfile.points, 1.0)
+        msrhpc.decimate_bands(bsfile.points[0], bsfile.points[1:], 640)
+
+    template = plotting.BsDosTemplate()
+
+    stages = {
+        'parse_band': lambda: msrhpc.BandFile(band, cache=False),
+        'parse_doss': lambda: msrhpc.DosFile(doss, cache=False),
+        'parse_cached': lambda: (msrhpc.BandFile(band).points.sum(), msrhpc.DosFile(doss).points.sum()),
+        'transform': transform,
+        'render': lambda: plotting.plot_bs_dos(band, doss, os.path.join(directory, name), '', '', eV=True, fermienergy=False,
+                                            display=False, template=template),
+    }
+
+    results = {stage: dict(zip(['time', 'peak_mb'], measure(function, repeats))) for stage, function in stages.items()}
+
+    plotting.plt.close(template.fig)
+
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    '''Prints every timing next to the baseline and flags changes beyond tolerance (a fraction of the baseline time)
+    that are also longer than a millisecond, so timer noise on the small cases is not reported. Returns the number of regressions.'''
+
+    regressions = 0
+
+    for case, stages in results.items():
+        for stage, result in stages.items():
+            reference = baseline.get(case, {}).get(stage)
+
+            if reference is None:
+                print('%-8s %-13s %9.4f s %8.1f MB' % (case, stage, result['time'], result['peak_mb']))
+                continue
+
+            change = result['time'] / reference['time'] - 1
+            significant = abs(result['time'] - reference['time']) > 1e-3
+            flag = ''
+            if change > tolerance and significant:
+                flag = 'SLOWER'
+                regressions += 1
+            elif change < -tolerance and significant:
+                flag = 'faster'
+
+            print('%-8s %-13s %9.4f s %8.1f MB   baseline %9.4f s %8.1f MB  %+6.0f%% %s' % (case, stage, result['time'],
+                  result['peak_mb'], reference['time'], reference['peak_mb'], 100 * change, flag))
+
+    return regressions
+
+
+def main(argv=None):
+    'Command line entry point: runs the benchmark cases and compares them with the baseline, or stores a new one.'
+
+    parser = argparse.ArgumentParser(description='Benchmarks parsing, transformation and rendering of synthetic CRYSTAL files.')
+    parser.add_argument('--cases', nargs='+', choices=[case[0] for case in cases], default=[case[0] for case in cases], help='cases to run (default: all)')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per stage after the memory traced one; the fastest is reported (default: 3)')
+    parser.add_argument('--baseline', default=default_baseline, help='baseline JSON file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative slowdown reported as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    plotting.use_agg()
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, nbands, nkpoints, nprojections, nenergies in cases:
+            if name in args.cases:
+                results[name] = benchmark_case(directory, name, nbands, nkpoints, nprojections, nenergies, args.repeats)
+
+    if args.save is True:
+        with open(args.baseline, 'w') as stream:
+            json.dump(results, stream, indent=1)
+        compare(results, {})
+        print('Saved baseline to', args.baseline)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as stream:
+            baseline = json.load(stream)
+    else:
+        print('No baseline at %s; run with --save to store one.' % args.baseline)
+
+    return 1 if compare(results, baseline, args.tolerance) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+'Writes synthetic CRYSTAL .BAND and .DOSS files of any size, with the header lines of the real ones, for benchmarking.'
+
+import argparse
+import sys
+
+import numpy as np
+
+tick_labels = ['(0,0,0)/6', '(3,0,0)/6', '(3,3,0)/6', '(2,2,0)/6', '(0,0,0)/6']
+tick_positions = [0.0, 1.0, 1.6, 2.2, 3.0]
+
+
+def write_band(filename, nbands=8, nkpoints=201, efermi=-0.153, seed=0):
+    '''Writes a .BAND file with nbands cosine-like bands (sorted at every k-point, relative to the Fermi level in Hartree)
+    along the graphene Gamma-X-M-K-Gamma path, with the # header, TITLE, XAXIS TICK/TICKLABEL and YAXIS LABEL lines.'''
+
+    generator = np.random.default_rng(seed)
+    kpoints = np.linspace(tick_positions[0], tick_positions[-1], nkpoints)
+
+    centres = np.linspace(-0.5, 0.5, nbands)[:, np.newaxis]
+    amplitudes = generator.uniform(0.01, 0.05, (nbands, 1))
+    phases = generator.uniform(0, 2 * np.pi, (nbands, 1))
+    energies = np.sort(centres + amplitudes * np.cos(3 * kpoints + phases), axis=0)
+
+    with open(filename, 'w') as stream:
+        stream.write('# NBND: %4d NKPT: %5d NSPIN:  1 NPANEL: %3d NDIM:  2 ITYPE:  0\n' % (nbands, nkpoints, len(tick_positions) - 1))
+        stream.write('# EFERMI (HARTREE): % .6f\n' % efermi)
+        stream.write('@ TITLE "SYNTHETIC BAND"\n@ XAXIS TICK SPEC TYPE\n@ XAXIS TICK SPEC %3d\n' % len(tick_positions))
+
+        for tick, (position, label) in enumerate(zip(tick_positions, tick_labels)):
+            stream.write('@ XAXIS TICK     %d, %.5f\n@ XAXIS TICKLABEL    %d, "%s"\n' % (tick, position, tick, label))
+
+        stream.write('@ YAXIS LABEL "E-EFERMI (HARTREE)"\n')
+        np.savetxt(stream, np.vstack((kpoints, energies)).T, fmt='%12.6f', delimiter='')
+
+
+def write_doss(filename, nprojections=3, npoints=301, efermi=-0.153, seed=0):
+    '''Writes a .DOSS file with nprojections non-negative projections on a uniform energy grid (relative to the Fermi
+    level in Hartree), with the # header, EFERMI and axis label lines. The last projection is the largest, like a total.'''
+
+    generator = np.random.default_rng(seed)
+    energies = np.linspace(-0.5, 0.5, npoints)
+
+    centres = generator.uniform(-0.4, 0.4, (nprojections, 1))
+    dos = np.exp(-(energies - centres) ** 2 / 0.02) * np.arange(1, nprojections + 1)[:, np.newaxis]
+
+    with open(filename, 'w') as stream:
+        stream.write('# NPROJ: %4d NPTS: %5d\n' % (nprojections, npoints))
+        stream.write('# EFERMI (HARTREE): % .6f\n' % efermi)
+        stream.write('@ XAXIS LABEL "E-EFERMI (HARTREE)"\n@ YAXIS LABEL "DENSITY OF STATES (STATES/HARTREE/CELL)"\n')
+        np.savetxt(stream, np.vstack((energies, dos)).T, fmt='%12.6f', delimiter='')
+
+
+def main(argv=None):
+    'Command line entry point: writes one synthetic .BAND and one .DOSS file.'
+
+    parser = argparse.ArgumentParser(description='Writes synthetic CRYSTAL .BAND and .DOSS files for benchmarks.')
+    parser.add_argument('stem', help='output filename without extension')
+    parser.add_argument('--bands', type=int, default=8, help='number of bands (default: 8)')
+    parser.add_argument('--kpoints', type=int, default=201, help='number of k-points (default: 201)')
+    parser.add_argument('--projections', type=int, default=3, help='number of DoS projections (default: 3)')
+    parser.add_argument('--energies', type=int, default=301, help='number of DoS energy points (default: 301)')
+    args = parser.parse_args(argv)
+
+    write_band(args.stem + '.BAND', args.bands, args.kpoints)
+    write_doss(args.stem + '.DOSS', args.projections, args.energies)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+'Command line band structure screening of .BAND files: band gaps, band edges, Fermi level crossings and effective masses (see msrhpc.analysis).'
+
+import argparse
+import sys
+
+from msrhpc import find_files
+from msrhpc.analysis import analyse_files, write_table
+
+
+def main(argv=None):
+    'Command line entry point: analyses every .BAND file under the given paths and writes a CSV or JSON table.'
+
+    parser = argparse.ArgumentParser(description='Screens CRYSTAL band structures for band gaps, band edges and Fermi level crossings without plotting.')
+    parser.add_argument('paths', nargs='+', help='directories to search recursively, glob patterns or .BAND files')
+    parser.add_argument('-o', '--output', default='band_analysis.csv', help='table to write, .csv or .json (default: band_analysis.csv)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--eV', action='store_true', help='report energies in eV instead of Hartree')
+    parser.add_argument('--masses', action='store_true', help='also fit effective masses at the VBM and CBM')
+    args = parser.parse_args(argv)
+
+    results = analyse_files(find_files(args.paths, '.BAND'), args.workers, args.eV, args.masses)
+    write_table(results, args.output)
+
+    failures = [result for result in results if 'error' in result]
+
+    print('Analysed %d of %d band structures.' % (len(results) - len(failures), len(results)))
+
+    for result in failures:
+        print('Failed:', result['file'], '-', result['error'])
+
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+'Command line export of .BAND/.DOSS files to NPZ or HDF5 archives, and a summary of what an archive holds (see msrhpc.archive).'
+
+import argparse
+import os
+import sys
+
+from msrhpc import BandFile, DosFile
+from msrhpc.archive import default_chunk, read_archive, write_archive
+
+
+def main(argv=None):
+    'Command line entry point: exports .BAND/.DOSS files to an archive, or prints what an archive holds.'
+
+    parser = argparse.ArgumentParser(description='Converts parsed CRYSTAL .BAND/.DOSS data to compact NPZ or HDF5 archives.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    exporter = commands.add_parser('export', help='write a .BAND and/or .DOSS file to an archive')
+    exporter.add_argument('files', nargs='+', help='a .BAND file, a .DOSS file, or one of each')
+    exporter.add_argument('-o', '--output', required=True, help='archive to write: .npz, or .h5/.hdf5 (needs h5py)')
+    exporter.add_argument('--no-compress', action='store_true', help='store the arrays uncompressed')
+    exporter.add_argument('--chunk', type=int, default=None, help='points per HDF5 chunk of one row (default: %d)' % default_chunk)
+
+    info = commands.add_parser('info', help='print the contents of an archive')
+    info.add_argument('archive', help='.npz, .h5 or .hdf5 archive')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        bsfile = dosfile = None
+
+        for filename in args.files:
+            if os.path.splitext(filename)[1].upper() == '.BAND':
+                bsfile = BandFile(filename)
+            elif os.path.splitext(filename)[1].upper() == '.DOSS':
+                dosfile = DosFile(filename)
+            else:
+                print('Error: %s is not a .BAND or .DOSS file.' % filename)
+                return 1
+
+        try:
+            write_archive(args.output, bsfile, dosfile, args.no_compress is False, args.chunk)
+        except (ImportError, ValueError) as error:
+            print('Error: %s.' % error)
+            return 1
+
+        print('Wrote %s (%d bytes).' % (args.output, os.path.getsize(args.output)))
+        return 0
+
+    try:
+        bsfile, dosfile = read_archive(args.archive)
+    except ImportError as error:
+        print('Error: %s.' % error)
+        return 1
+
+    if bsfile is not None:
+        print('band: %d bands, %d k-points, %s, E_F = %s Hartree, ticks %s' % (bsfile.nbands, bsfile.points.shape[1],
+              'spin-polarized' if bsfile.spinpolarized else 'closed shell', bsfile.efermi, ' '.join(bsfile.tick_labels)))
+    if dosfile is not None:
+        print('dos: %d projections, %d energies, %s, E_F = %s Hartree' % (dosfile.nprojections, dosfile.points.shape[1],
+              'spin-polarized' if dosfile.spinpolarized else 'closed shell', dosfile.efermi))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+'Command line scanning and querying of the SQLite index of .BAND and .DOSS metadata and band gaps (see msrhpc.index).'
+
+import argparse
+import sys
+
+from msrhpc.index import connect, query, scan
+
+
+def main(argv=None):
+    'Command line entry point: scan a tree into the index, or list the indexed files matching a query.'
+
+    parser = argparse.ArgumentParser(description='Indexes CRYSTAL .BAND/.DOSS metadata and band gaps in an SQLite database and queries it.')
+    parser.add_argument('--database', default='crystal_index.sqlite', help='index database (default: crystal_index.sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scanner = commands.add_parser('scan', help='add new and changed files under the given paths to the index')
+    scanner.add_argument('paths', nargs='+', help='directories to search recursively, glob patterns or files')
+    scanner.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+
+    finder = commands.add_parser('query', help='list the indexed files matching every condition given')
+    finder.add_argument('--kind', choices=['BAND', 'DOSS'], default=None, help='only .BAND or only .DOSS files')
+    finder.add_argument('--min-gap', type=float, default=None, metavar='EV', help='band gap of at least EV eV')
+    finder.add_argument('--max-gap', type=float, default=None, metavar='EV', help='band gap of at most EV eV')
+    finder.add_argument('--metallic', choices=['yes', 'no'], default=None, help='only band structures that do (yes) or do not (no) cross the Fermi level')
+    finder.add_argument('--direct', choices=['yes', 'no'], default=None, help='only direct (yes) or indirect (no) band gaps')
+    finder.add_argument('--kpath', default=None, help='k-path as tick labels separated by spaces, e.g. "(0,0,0)/6 (3,0,0)/6 (0,0,0)/6"')
+    finder.add_argument('--title', default=None, help='title containing this text')
+    args = parser.parse_args(argv)
+
+    connection = connect(args.database)
+
+    if args.command == 'scan':
+        rows, unchanged, removed = scan(connection, args.paths, args.workers)
+        failures = [row for row in rows if row['error'] is not None]
+
+        print('Read %d files, %d unchanged, %d removed.' % (len(rows), unchanged, removed))
+
+        for row in failures:
+            print('Failed:', row['path'], '-', row['error'])
+
+        return 1 if len(failures) > 0 else 0
+
+    metallic, direct = [None if value is None else value == 'yes' for value in [args.metallic, args.direct]]
+
+    for row in query(connection, args.kind, args.min_gap, args.max_gap, metallic, direct, args.kpath, args.title):
+        print(row['path'])
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+'Command line entry point of the browser viewer for big band structures and densities of states (see msrhpc.viewer).'
+
+import argparse
+import sys
+
+from msrhpc.viewer import serve
+
+
+def main(argv=None):
+    'Command line entry point.'
+
+    parser = argparse.ArgumentParser(description='Serves a CRYSTAL band structure (and DoS) to a browser, sending only the visible, decimated data.')
+    parser.add_argument('band', help='.BAND file')
+    parser.add_argument('doss', nargs='?', default=None, help='.DOSS file (optional)')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on, 0 for any free port (default: 8000)')
+    parser.add_argument('--hartree', action='store_true', help='show energies in Hartree instead of eV')
+    parser.add_argument('--browser', action='store_true', help='open the viewer in the default web browser')
+    args = parser.parse_args(argv)
+
+    serve(args.band, args.doss, args.host, args.port, args.hartree is False, args.browser)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
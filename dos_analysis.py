@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+'Command line density of states analysis of .DOSS files: electron counts and band centres of every projection (see msrhpc.dos).'
+
+import argparse
+import csv
+import sys
+
+from msrhpc import find_files
+from msrhpc.dos import analyse_dos_file
+
+
+def main(argv=None):
+    'Command line entry point: writes electron counts and band centres of every projection (and spin channel) of the .DOSS files found to a CSV table.'
+
+    parser = argparse.ArgumentParser(description='Integrates CRYSTAL densities of states and reports band centres for every projection.')
+    parser.add_argument('paths', nargs='+', help='directories to search recursively, glob patterns or .DOSS files')
+    parser.add_argument('-o', '--output', default='dos_analysis.csv', help='CSV table to write (default: dos_analysis.csv)')
+    parser.add_argument('--range', type=float, nargs=2, default=(None, None), metavar=('EMIN', 'EMAX'), help='energy range for band centres, in Hartree relative to the Fermi level (default: all)')
+    parser.add_argument('--eV', action='store_true', help='report centres and widths in eV instead of Hartree')
+    args = parser.parse_args(argv)
+
+    rows = []
+    failures = 0
+
+    for filename in find_files(args.paths, '.DOSS'):
+        try:
+            rows.extend(analyse_dos_file(filename, args.range[0], args.range[1], args.eV))
+        except Exception as error:
+            failures += 1
+            print('Failed:', filename, '-', '%s: %s' % (type(error).__name__, error))
+
+    with open(args.output, 'w', newline='') as stream:
+        writer = csv.DictWriter(stream, ['file', 'projection', 'spin', 'unit', 'electrons', 'centre', 'width'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return 1 if failures > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+'''Reading, analysing and plotting CRYSTAL band structures (.BAND) and densities of states (.DOSS).
+
+The package root holds the NumPy-only core: parsing (parse), energy units (energy), transformations for drawing
+(transform) and file discovery (files). Band structure and DoS analysis are in msrhpc.analysis and msrhpc.dos, which
+also need only NumPy, like the binary archives (msrhpc.archive), the SQLite metadata index (msrhpc.index) and the
+browser viewer (msrhpc.viewer). Figures are in msrhpc.plotting, batches and watching in msrhpc.batch and
+the command line in msrhpc.cli; they import matplotlib only when something is drawn.'''
+
+from .energy import (HARTREE_TO_EV, convert_energies, convert_energy_label, ev_to_hartree, hartree_to_ev, to_absolute,
+                     to_relative)
+from .files import figure_stem, file_signature, find_bs_dos_pairs, find_files, search_root
+from .parse import (BandFile, CrystalFile, DosFile, bands_in_window, get_bs_labels, get_bs_points, get_dos_labels,
+                    get_dos_points, getfermienergy, open_file, read_blocks)
+from .transform import align_kpath, decimate_bands, reconnect_bands
+
+__all__ = ['HARTREE_TO_EV', 'convert_energies', 'convert_energy_label', 'ev_to_hartree', 'hartree_to_ev', 'to_absolute',
+           'to_relative', 'figure_stem', 'file_signature', 'find_bs_dos_pairs', 'find_files', 'search_root', 'BandFile',
+           'CrystalFile', 'DosFile', 'bands_in_window', 'get_bs_labels', 'get_bs_points', 'get_dos_labels', 'get_dos_points',
+           'getfermienergy', 'open_file', 'read_blocks', 'align_kpath', 'decimate_bands', 'reconnect_bands']
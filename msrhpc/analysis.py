@@ -0,0 +1,292 @@
+'Band structure analysis of parsed .BAND data: band gaps, VBM/CBM, Fermi level crossings, band widths and effective masses.'
+
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .energy import HARTREE_TO_EV
+from .parse import BandFile
+
+
+def fermi_crossings(kpoints, energies):
+    '''Finds where bands cross the Fermi level (zero energy). energies has shape (n_bands, n_points).
+    Returns the band rows and the k-distances of the crossings, linearly interpolated between k-points.'''
+
+    above = energies > 0
+    band, index = np.nonzero(above[:, 1:] != above[:, :-1])
+
+    e0 = energies[band, index]
+    e1 = energies[band, index + 1]
+    k0 = kpoints[index]
+    k1 = kpoints[index + 1]
+
+    return band, k0 + (k1 - k0) * (0 - e0) / (e1 - e0)
+
+
+def analyse_bands(points, bands=None, eV=False, tolerance=1e-6, spins=None):
+    '''Analyses .BAND points (column 0 the k-distance, the rest band energies relative to the Fermi level in Hartree).
+    bands lists the band numbers of the rows (default 1, 2, ...). A band is taken as crossing the Fermi level if it
+    reaches more than tolerance Hartree either side of it. For both spin channels at once (see spin_channels), spins
+    lists the channel ('alpha' or 'beta') of every row, and the channels of the band edges are added as vbm_spin and
+    cbm_spin. Returns a dictionary with:
+        metallic, crossing_bands, crossings (band, k) - bands that cross the Fermi level and where
+        gap, direct - band gap (0 for metals) and whether VBM and CBM are at the same k-point (None for metals)
+        vbm, vbm_band, vbm_k, cbm, cbm_band, cbm_k - band edges, their band numbers and k-distances (None if absent)
+        widths - the width of every band
+    Energies are in Hartree, or eV if eV is True.'''
+
+    kpoints = np.asarray(points[0])
+    energies = np.asarray(points[1:])
+
+    if bands is None:
+        bands = np.arange(1, len(energies) + 1)
+    bands = np.asarray(bands)
+
+    scale = HARTREE_TO_EV if eV is True else 1
+
+    emin = np.amin(energies, axis=1)
+    emax = np.amax(energies, axis=1)
+
+    crossing = (emin < -tolerance) & (emax > tolerance)
+    valence = ~crossing & (emax <= tolerance)
+    conduction = ~crossing & ~valence
+
+    crossingrows, crossingk = fermi_crossings(kpoints, energies[crossing])
+
+    results = {
+        'nbands': len(energies),
+        'nkpoints': len(kpoints),
+        'metallic': bool(np.any(crossing)),
+        'crossing_bands': bands[crossing].tolist(),
+        'crossings': list(zip(bands[crossing][crossingrows].tolist(), crossingk.tolist())),
+        'widths': ((emax - emin) * scale).tolist(),
+    }
+
+    vbm = cbm = None
+
+    if np.any(valence):
+        row = np.flatnonzero(valence)[np.argmax(emax[valence])]
+        vbm = int(np.argmax(energies[row]))
+        results.update(vbm=float(emax[row] * scale), vbm_band=int(bands[row]), vbm_k=float(kpoints[vbm]))
+        if spins is not None:
+            results['vbm_spin'] = spins[row]
+    else:
+        results.update(vbm=None, vbm_band=None, vbm_k=None)
+        if spins is not None:
+            results['vbm_spin'] = None
+
+    if np.any(conduction):
+        row = np.flatnonzero(conduction)[np.argmin(emin[conduction])]
+        cbm = int(np.argmin(energies[row]))
+        results.update(cbm=float(emin[row] * scale), cbm_band=int(bands[row]), cbm_k=float(kpoints[cbm]))
+        if spins is not None:
+            results['cbm_spin'] = spins[row]
+    else:
+        results.update(cbm=None, cbm_band=None, cbm_k=None)
+        if spins is not None:
+            results['cbm_spin'] = None
+
+    if results['metallic'] is True or vbm is None or cbm is None:
+        results.update(gap=0.0, direct=None)
+    else:
+        # The same k-point can appear twice where path segments meet, so compare k-distances
+        results.update(gap=results['cbm'] - results['vbm'], direct=bool(np.isclose(kpoints[vbm], kpoints[cbm])))
+
+    return results
+
+
+def path_segments(kpoints, tick_positions, tolerance=1e-6):
+    '''Splits the k-path at the high-symmetry tick positions from get_bs_labels/BandFile.
+    Returns a list of (start, stop) index ranges into kpoints, one per segment, including the points at both ticks.'''
+
+    kpoints = np.asarray(kpoints)
+    ticks = np.asarray(tick_positions)
+
+    starts = np.searchsorted(kpoints, ticks[:-1] - tolerance, side='left')
+    stops = np.searchsorted(kpoints, ticks[1:] + tolerance, side='right')
+
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def effective_masses(points, tick_positions, bands=None, npoints=5, extremum='auto', tolerance=1e-6):
+    '''Fits parabolas to the extrema of every band within each high-symmetry segment of the k-path, all bands at once.
+    points is .BAND data (column 0 the k-distance, the rest band energies relative to the Fermi level) and tick_positions
+    the segment ends. In each segment the maximum of a band is used if extremum is 'max', the minimum if 'min', and
+    with 'auto' the maximum for bands below the Fermi level and the minimum for the others. The npoints k-points
+    around the extremum are fitted by least squares. With energies in Hartree and k in bohr^-1 the masses are in
+    electron masses. Returns a dictionary of arrays of shape (n_segments, n_bands):
+        k, energy - position and energy of the extremum
+        mass - effective mass, 1 / (d2E/dk2), negative at maxima
+        residual - root mean square residual of the fit
+    plus bands (the band numbers), kinds ('max' or 'min' for each band) and segments ((start k, end k) for each segment).
+    Segments with fewer than npoints k-points give nan.'''
+
+    kpoints = np.asarray(points[0])
+    energies = np.asarray(points[1:])
+    nbands = len(energies)
+
+    if bands is None:
+        bands = np.arange(1, nbands + 1)
+
+    if extremum == 'auto':
+        maxima = np.amax(energies, axis=1) <= tolerance
+    else:
+        maxima = np.full(nbands, extremum == 'max')
+
+    # Searching for the largest of sign * E finds maxima and minima together
+    sign = np.where(maxima, 1.0, -1.0)[:, np.newaxis]
+
+    segments = path_segments(kpoints, tick_positions, tolerance)
+    shape = (len(segments), nbands)
+    results = {name: np.full(shape, np.nan) for name in ['k', 'energy', 'mass', 'residual']}
+
+    rows = np.arange(nbands)[:, np.newaxis]
+
+    for segment, (start, stop) in enumerate(segments):
+        if stop - start < npoints:
+            continue
+
+        segmentk = kpoints[start:stop]
+        segmentenergies = energies[:, start:stop]
+
+        centre = np.argmax(sign * segmentenergies, axis=1)
+        first = np.clip(centre - npoints // 2, 0, stop - start - npoints)
+        window = first[:, np.newaxis] + np.arange(npoints)
+
+        x = segmentk[window] - segmentk[centre][:, np.newaxis]
+        y = segmentenergies[rows, window]
+
+        # Least squares for E = a x^2 + b x + c for every band; pinv copes with the repeated k-points at segment ends
+        design = np.stack((x ** 2, x, np.ones_like(x)), axis=-1)
+        coefficients = np.matmul(np.linalg.pinv(design), y[:, :, np.newaxis])
+        fitted = np.matmul(design, coefficients)[:, :, 0]
+
+        with np.errstate(divide='ignore'):
+            results['mass'][segment] = 1 / (2 * coefficients[:, 0, 0])
+
+        results['residual'][segment] = np.sqrt(np.mean((fitted - y) ** 2, axis=1))
+        results['k'][segment] = segmentk[centre]
+        results['energy'][segment] = segmentenergies[rows[:, 0], centre]
+
+    results['bands'] = np.asarray(bands)
+    results['kinds'] = np.where(maxima, 'max', 'min')
+    results['segments'] = [(float(kpoints[start]), float(kpoints[stop - 1])) for start, stop in segments]
+
+    return results
+
+
+def edge_masses(points, tick_positions, results, bands=None, npoints=5, spins=None):
+    '''Effective masses at the VBM and CBM found by analyse_bands, from the segment where each band edge lies.
+    spins lists the spin channel of every row, as given to analyse_bands.
+    Returns a dictionary with vbm_mass, vbm_mass_residual, cbm_mass and cbm_mass_residual (None if there is no such edge).'''
+
+    if bands is None:
+        bands = list(range(1, len(points)))
+    if spins is None:
+        spins = [None] * len(bands)
+    rows = list(zip(bands, spins))
+
+    masses = {}
+
+    for edge, kind in [('vbm', 'max'), ('cbm', 'min')]:
+        masses[edge + '_mass'] = masses[edge + '_mass_residual'] = None
+
+        if results[edge + '_band'] is None:
+            continue
+
+        row = rows.index((results[edge + '_band'], results.get(edge + '_spin')))
+        fits = effective_masses(points[[0, row + 1]], tick_positions, npoints=npoints, extremum=kind)
+
+        # The segment whose extremum is the band edge
+        energy = fits['energy'][:, 0]
+        if np.all(np.isnan(energy)):
+            continue
+        segment = np.nanargmax(energy) if kind == 'max' else np.nanargmin(energy)
+
+        masses[edge + '_mass'] = float(fits['mass'][segment, 0])
+        masses[edge + '_mass_residual'] = float(fits['residual'][segment, 0])
+
+    return masses
+
+
+def spin_channels(bsfile):
+    '''The bands of both spin channels of a BandFile as one set of points for analyse_bands: the alpha bands followed by
+    the beta bands of a spin-polarized file. Returns (points, bands, spins), with the band number and spin channel of every row,
+    or spins None for a closed shell file.'''
+
+    if bsfile.beta is None:
+        return bsfile.points, bsfile.bands, None
+
+    points = np.vstack((bsfile.points, bsfile.beta[1:]))
+    spins = ['alpha'] * bsfile.nbands + ['beta'] * bsfile.nbands
+
+    return points, bsfile.bands + bsfile.bands, spins
+
+
+def analyse_file(filename, eV=False, masses=False):
+    '''Analyses one .BAND file with analyse_bands and adds the file name and Fermi energy to the results.
+    Both spin channels of a spin-polarized file are analysed together, so the gap is the one between the highest
+    occupied and lowest unoccupied band of either channel.
+    If masses is True the effective masses at the VBM and CBM are added as well (see edge_masses).'''
+
+    bsfile = BandFile(filename)
+    points, bands, spins = spin_channels(bsfile)
+
+    results = {'file': filename, 'efermi': bsfile.efermi, 'unit': 'eV' if eV is True else 'Hartree', 'spinpolarized': spins is not None}
+    results.update(analyse_bands(points, bands, eV, spins=spins))
+    results['nbands'] = bsfile.nbands
+
+    if masses is True:
+        results.update(edge_masses(points, bsfile.tick_positions, results, bands, spins=spins))
+
+    if eV is True and bsfile.efermi is not None:
+        results['efermi'] = bsfile.efermi * HARTREE_TO_EV
+
+    return results
+
+
+def analyse_job(job):
+    'Worker for analyse_files: returns the results for one file, or the file and the error if it could not be analysed.'
+
+    filename, eV, masses = job
+
+    try:
+        return analyse_file(filename, eV, masses)
+    except Exception as error:
+        return {'file': filename, 'error': '%s: %s' % (type(error).__name__, error)}
+
+
+def analyse_files(filenames, workers=None, eV=False, masses=False):
+    'Analyses many .BAND files in a pool of worker processes. Returns a list of result dictionaries in the order given.'
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyse_job, [(filename, eV, masses) for filename in filenames], chunksize=8))
+
+
+table_fields = ['file', 'unit', 'efermi', 'spinpolarized', 'nbands', 'nkpoints', 'metallic', 'gap', 'direct',
+                'vbm', 'vbm_band', 'vbm_spin', 'vbm_k', 'cbm', 'cbm_band', 'cbm_spin', 'cbm_k', 'crossing_bands', 'min_width', 'max_width',
+                'vbm_mass', 'vbm_mass_residual', 'cbm_mass', 'cbm_mass_residual', 'error']
+
+
+def write_table(results, filename):
+    '''Writes analysis results to filename as JSON if it ends in .json, otherwise as CSV.
+    The JSON keeps every field; the CSV has one row per file with the per-band widths reduced to their range.'''
+
+    if filename.lower().endswith('.json'):
+        with open(filename, 'w') as stream:
+            json.dump(results, stream, indent=1)
+        return
+
+    with open(filename, 'w', newline='') as stream:
+        writer = csv.DictWriter(stream, table_fields, extrasaction='ignore')
+        writer.writeheader()
+
+        for result in results:
+            row = dict(result)
+            if 'widths' in row:
+                row['min_width'] = min(row['widths']) if len(row['widths']) > 0 else None
+                row['max_width'] = max(row['widths']) if len(row['widths']) > 0 else None
+                row['crossing_bands'] = ' '.join(str(band) for band in row['crossing_bands'])
+            writer.writerow(row)
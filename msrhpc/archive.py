@@ -0,0 +1,153 @@
+'''Compact binary archives of parsed .BAND and .DOSS data, as NPZ or (with h5py) HDF5, so later jobs can load the
+arrays and labels without parsing the text again.
+
+Both formats hold the same entries, under a band/ and a dos/ group:
+    points        the (n_columns, n_points) block, column 0 the k-distance or energy (Hartree, relative to the Fermi level)
+    beta          the beta block of a spin-polarized file, if any
+    header        the header attributes of BandFile/DosFile as JSON
+    efermi        the Fermi energy in Hartree (nan if unknown)
+    tick_positions, tick_labels    the k-path ticks (band only)
+and the root attributes format_version, units and energies.'''
+
+import json
+import os
+
+import numpy as np
+
+from .parse import BandFile, DosFile
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+format_version = 1
+units = 'Hartree'
+energies = 'relative to the Fermi energy'
+
+# Points per HDF5 chunk when none is given; every chunk holds part of a single row (band or projection)
+default_chunk = 16384
+extensions = ['.npz', '.h5', '.hdf5']
+
+
+def archive_entries(bsfile=None, dosfile=None):
+    'The arrays to store for a BandFile and/or DosFile, keyed by their path in the archive.'
+
+    entries = {}
+
+    for group, crystalfile in [('band', bsfile), ('dos', dosfile)]:
+        if crystalfile is None:
+            continue
+
+        entries[group + '/points'] = np.asarray(crystalfile.points)
+        if crystalfile.beta is not None:
+            entries[group + '/beta'] = np.asarray(crystalfile.beta)
+
+        entries[group + '/header'] = np.array(json.dumps(crystalfile.header()))
+        entries[group + '/efermi'] = np.array(np.nan if crystalfile.efermi is None else crystalfile.efermi)
+
+    if bsfile is not None:
+        entries['band/tick_positions'] = np.asarray(bsfile.tick_positions, dtype=float)
+        entries['band/tick_labels'] = np.asarray(bsfile.tick_labels, dtype=str)
+
+    return entries
+
+
+def write_archive(filename, bsfile=None, dosfile=None, compress=True, chunk=None):
+    '''Writes a BandFile and/or DosFile to filename: HDF5 if it ends in .h5 or .hdf5, NPZ if it ends in .npz.
+    Raises ValueError for any other extension, which np.savez would otherwise extend with .npz.
+    compress selects zip deflate for NPZ and gzip for HDF5. HDF5 arrays are stored in chunks of one row and chunk
+    points (default: default_chunk), so reading a few bands or projections touches only their chunks.'''
+
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension not in extensions:
+        raise ValueError('%s does not end in %s' % (filename, ', '.join(extensions)))
+
+    entries = archive_entries(bsfile, dosfile)
+
+    if extension in ['.h5', '.hdf5']:
+        if h5py is None:
+            raise ImportError('writing HDF5 archives needs h5py')
+
+        with h5py.File(filename, 'w') as archive:
+            archive.attrs.update(format_version=format_version, units=units, energies=energies)
+
+            for path, values in entries.items():
+                if values.ndim == 2:
+                    chunks = (1, max(min(default_chunk if chunk is None else chunk, values.shape[1]), 1))
+                    archive.create_dataset(path, data=values, chunks=chunks, compression='gzip' if compress is True else None,
+                                           shuffle=compress is True)
+                elif values.dtype.kind == 'U':
+                    archive.create_dataset(path, data=values.astype(object), dtype=h5py.string_dtype())
+                else:
+                    archive.create_dataset(path, data=values)
+
+    else:
+        attributes = {'format_version': np.array(format_version), 'units': np.array(units), 'energies': np.array(energies)}
+        (np.savez_compressed if compress is True else np.savez)(filename, **entries, **attributes)
+
+
+def select_rows(dataset, rows):
+    '''Reads rows (a list of row indices) of a 2D array or HDF5 dataset in the order given. HDF5 only reads increasing,
+    distinct indices, so those are read and then reordered.'''
+
+    if rows is None:
+        return np.asarray(dataset[()])
+
+    distinct = sorted(set(rows))
+    values = np.asarray(dataset[distinct, :])
+
+    return values[[distinct.index(row) for row in rows]]
+
+
+def read_archive(filename, bands=None, projections=None):
+    '''Reads an archive written by write_archive. Returns (bsfile, dosfile) as BandFile and DosFile instances (None
+    for a part the archive does not hold), which the plotting and analysis functions accept like parsed files.
+    bands and projections are optional lists of band and projection numbers (1 for the first) to load; from HDF5
+    only those rows are read from disk.'''
+
+    hdf5 = os.path.splitext(filename)[1].lower() in ['.h5', '.hdf5']
+
+    if hdf5 is True and h5py is None:
+        raise ImportError('reading HDF5 archives needs h5py')
+
+    archive = h5py.File(filename, 'r') if hdf5 is True else np.load(filename)
+
+    try:
+        if hdf5 is True:
+            names = set()
+            archive.visit(names.add)
+        else:
+            names = set(archive.files)
+
+        result = []
+
+        for group, cls, selection in [('band', BandFile, bands), ('dos', DosFile, projections)]:
+            if group + '/points' not in names:
+                result.append(None)
+                continue
+
+            header = archive[group + '/header'][()]
+            header = json.loads(header.decode() if isinstance(header, bytes) else str(header))
+
+            rows = None if selection is None else [0] + list(selection)
+
+            # An NPZ member is read in full on access, an HDF5 dataset only when sliced
+            dataset = archive[group + '/points']
+
+            if rows is not None and max(rows) >= dataset.shape[0]:
+                raise IndexError('%s %d is not in the archive' % ('band' if group == 'band' else 'projection', max(rows)))
+
+            points = select_rows(dataset, rows)
+            beta = select_rows(archive[group + '/beta'], rows) if group + '/beta' in names else None
+
+            if cls is BandFile:
+                result.append(BandFile.from_arrays(filename, points, header, beta, selection))
+            else:
+                result.append(DosFile.from_arrays(filename, points, header, beta))
+
+    finally:
+        archive.close()
+
+    return tuple(result)
@@ -0,0 +1,131 @@
+'Plotting many calculations: batches in a process pool, and watching directories to re-render pairs as their files change.'
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .files import figure_stem, file_signature, find_bs_dos_pairs, search_root
+from .plotting import BsDosTemplate, plot_bs_dos, plt, use_agg
+
+batchtemplate = None
+
+
+def plot_pair(job):
+    '''Batch worker: plots one (band, doss, output, options) job with plot_bs_dos without displaying it.
+    Each worker process draws all its jobs into one BsDosTemplate figure.
+    Returns (band, None) on success and (band, error message) on failure, so one bad file does not stop the batch.'''
+    
+    global batchtemplate
+    
+    band, doss, output, options = job
+    
+    try:
+        if batchtemplate is None:
+            batchtemplate = BsDosTemplate()
+        
+        if plot_bs_dos(band, doss, output, '', '', eV = options['eV'], fermienergy = options['fermienergy'], fmt = options['fmt'], display = False, template = batchtemplate, decimate = options['decimate'], dpi = options['dpi'], rasterize = options['rasterize']) is False:
+            return band, 'no bands to plot'
+    
+    except Exception as error:
+        # Start the next job from a fresh figure in case this one was left half drawn
+        plt.close('all')
+        batchtemplate = None
+        return band, '%s: %s' % (type(error).__name__, error)
+    
+    return band, None
+
+
+def batch_plot(pairs, workers=None, outdir=None, eV=False, fermienergy=False, fmt='png', decimate=None, dpi=None, rasterize=False, root=None):
+    '''Plots every (band, doss) pair side by side in a pool of worker processes, each rendering with its own Agg figures.
+    Figures are saved next to the .BAND file, or in outdir if given, under their path relative to root (default: the
+    deepest directory holding all the pairs). Prints a summary and returns the list of (band, error) failures.'''
+    
+    if root is None and len(pairs) > 0:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(band)) for band, doss in pairs])
+    
+    options = {'eV': eV, 'fermienergy': fermienergy, 'fmt': fmt, 'decimate': decimate, 'dpi': dpi, 'rasterize': rasterize}
+    jobs = [(band, doss, figure_stem(band, outdir, root), options) for band, doss in pairs]
+    
+    if outdir is not None:
+        for directory in set(os.path.dirname(output) for band, doss, output, options in jobs) | {outdir}:
+            os.makedirs(directory, exist_ok=True)
+    
+    failures = []
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_agg) as pool:
+        for band, error in pool.map(plot_pair, jobs):
+            if error is not None:
+                failures.append((band, error))
+    
+    print('Plotted %d of %d calculations.' % (len(jobs) - len(failures), len(jobs)))
+    
+    for band, error in failures:
+        print('Failed:', band, '-', error)
+    
+    return failures
+
+
+async def watch_pairs(paths, interval=2.0, settle=5.0, workers=None, outdir=None, once=False, **options):
+    '''Keeps the plot_bs_dos figures of every .BAND/.DOSS pair under paths up to date, polling every interval seconds.
+    A pair is re-rendered once the modification times and sizes of both files have not changed for settle seconds,
+    so files still being written by a running job are left alone. At the start only pairs whose figure is missing or
+    older than its inputs are rendered. Rendering runs in worker processes as in batch_plot, with the other keywords
+    (eV, fermienergy, fmt, decimate, dpi, rasterize) as its options; unchanged files are loaded from their caches.
+    Figures in outdir keep their path relative to the search root of paths (see search_root).
+    Runs until cancelled, or returns once nothing is left to render if once is True.'''
+    
+    root = search_root(paths)
+    options = {'eV': False, 'fermienergy': False, 'fmt': 'png', 'decimate': None, 'dpi': None, 'rasterize': False, **options}
+    
+    if outdir is not None:
+        os.makedirs(outdir, exist_ok=True)
+    
+    loop = asyncio.get_running_loop()
+    rendered = {}
+    pending = {}
+    running = {}
+    
+    # Figures newer than their inputs count as rendered, so a restart does not redo the whole tree
+    for band, doss in find_bs_dos_pairs(paths):
+        figure = figure_stem(band, outdir, root) + '.' + options['fmt']
+        signature = file_signature([band, doss])
+        if signature is not None and os.path.exists(figure) and os.stat(figure).st_mtime_ns >= np.amax([change for change, size in signature]):
+            rendered[band] = signature
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_agg) as pool:
+        while True:
+            now = loop.time()
+            
+            for band, doss in find_bs_dos_pairs(paths):
+                signature = file_signature([band, doss])
+                
+                if signature is None or band in running or rendered.get(band) == signature:
+                    continue
+                
+                # Debounce: restart the clock whenever the files are still changing
+                if band not in pending or pending[band][0] != signature:
+                    pending[band] = (signature, now)
+                
+                elif now - pending[band][1] >= settle:
+                    del pending[band]
+                    job = (band, doss, figure_stem(band, outdir, root), options)
+                    if outdir is not None:
+                        os.makedirs(os.path.dirname(job[2]), exist_ok=True)
+                    running[band] = (signature, loop.run_in_executor(pool, plot_pair, job))
+            
+            for band in [band for band in running if running[band][1].done()]:
+                signature, future = running.pop(band)
+                error = future.result()[1]
+                rendered[band] = signature
+                
+                if error is None:
+                    print('Plotted', band)
+                else:
+                    print('Failed:', band, '-', error)
+            
+            if once is True and len(pending) == 0 and len(running) == 0:
+                return rendered
+            
+            await asyncio.sleep(interval)
@@ -0,0 +1,186 @@
+'The bs_dos_plot command line: bs, dos, both, compare, batch and watch commands, and the interactive prompts.'
+
+import argparse
+import asyncio
+import os
+import sys
+
+from .batch import batch_plot, watch_pairs
+from .files import find_bs_dos_pairs, search_root
+from .plotting import plot_bs, plot_bs_dos, plot_compare, plot_dos, use_agg
+
+
+def interactive():
+    'Asks for the plot type, files and options at the prompt, as the script always has.'
+    
+    input0 = input('Plot band structure, density of states or both? BS/DoS/Both ')
+    
+    if input0 in ['BS', 'bs']:
+        input1 = input('Band structure filename? ')
+        input3 = input('Desired destination filename? ')
+        input4 = input('Which bands do you want to print? (Leave blank for all) ')
+        input5 = input('Print in eV? Y/N ')
+        input6 = input('Absolute energy? Y/N ')
+        input7 = input('Band structure title? (Leave blank for default title) ')
+        
+        bands = [int(band) for band in input4.split(',') if len(band.strip()) > 0]
+        
+        plot_bs(input1, input3, input7, *bands, eV = input5 in ['Y', 'y'], fermienergy = input6 in ['Y', 'y'])
+    
+    elif input0 in ['DoS', 'dos', 'DOS']:
+        input2 = input('Density of states filename? ')
+        input3 = input('Desired destination filename? ')
+        input5 = input('Print in eV? Y/N ')
+        input6 = input('Absolute energy? Y/N ')
+        input8 = input('Density of states title? (Leave blank for default title) ')
+        
+        plot_dos(input2, input3, input8, eV = input5 in ['Y', 'y'], fermienergy = input6 in ['Y', 'y'])
+    
+    elif input0 in ['Both', 'both']:
+        input1 = input('Band structure filename? ')
+        input2 = input('Density of states filename? ')
+        input3 = input('Desired destination filename? ')
+        input4 = input('Which bands do you want to print? (Leave blank for all) ')
+        input5 = input('Print in eV? Y/N ')
+        input6 = input('Absolute energy? Y/N ')
+        input7 = input('Band structure title? (Leave blank for default title) ')
+        input8 = input('Density of states title? (Leave blank for default title) ')
+        
+        bands = [int(band) for band in input4.split(',') if len(band.strip()) > 0]
+        
+        plot_bs_dos(input1, input2, input3, input7, input8, *bands, eV = input5 in ['Y', 'y'], fermienergy = input6 in ['Y', 'y'])
+
+
+def positive_int(text):
+    'argparse type for counts that must be at least 1, such as the number of --decimate buckets.'
+    
+    value = int(text)
+    
+    if value < 1:
+        raise argparse.ArgumentTypeError('%s is not a positive integer' % text)
+    
+    return value
+
+
+def command_line_parser():
+    'Builds the argparse parser for the bs, dos, both, compare, batch and watch commands.'
+    
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument('--eV', action='store_true', help='plot energies in eV instead of Hartree')
+    options.add_argument('--absolute', action='store_true', help='plot absolute energies instead of E - E_Fermi')
+    options.add_argument('--format', default='png', help='output format understood by savefig, e.g. png, pdf, svg (default: png)')
+    options.add_argument('--dpi', type=float, default=None, help='resolution of png output and of rasterized lines (default: savefig.dpi)')
+    options.add_argument('--rasterize', action='store_true', help='draw the band and DoS lines as an image inside pdf/svg output, keeping axes and labels vector')
+    
+    singleoptions = argparse.ArgumentParser(add_help=False)
+    singleoptions.add_argument('-o', '--output', help='destination filename without extension (default: input filename without extension)')
+    singleoptions.add_argument('--headless', action='store_true', help='render with the Agg backend and do not open a window')
+    
+    bandoptions = argparse.ArgumentParser(add_help=False)
+    bandselection = bandoptions.add_mutually_exclusive_group()
+    bandselection.add_argument('--window', type=float, default=None, metavar='EV', help='plot only the bands within EV eV of the Fermi energy')
+    bandselection.add_argument('--bands', type=int, nargs='+', metavar='BAND', default=[], help='plot one band, or a first and last band (default: all)')
+    bandoptions.add_argument('--reconnect', action='store_true', help='draw bands as smooth branches through crossings instead of in energy order')
+    
+    decimateoptions = argparse.ArgumentParser(add_help=False)
+    decimateoptions.add_argument('--decimate', type=positive_int, nargs='?', const=True, default=None, metavar='BUCKETS', help='thin out dense k-paths to the first, lowest, highest and last point per pixel, or per one of BUCKETS buckets')
+    
+    parser = argparse.ArgumentParser(description='Plots CRYSTAL band structures (.BAND) and densities of states (.DOSS). Run without arguments for interactive prompts.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    bs = commands.add_parser('bs', parents=[options, singleoptions, bandoptions, decimateoptions], help='plot a band structure')
+    bs.add_argument('band', help='.BAND file')
+    bs.add_argument('--title', default='', help='band structure title')
+    
+    dos = commands.add_parser('dos', parents=[options, singleoptions], help='plot a density of states')
+    dos.add_argument('doss', help='.DOSS file')
+    dos.add_argument('--title', default='', help='density of states title')
+    
+    both = commands.add_parser('both', parents=[options, singleoptions, bandoptions, decimateoptions], help='plot a band structure and density of states side by side')
+    both.add_argument('band', help='.BAND file')
+    both.add_argument('doss', help='.DOSS file')
+    both.add_argument('--bs-title', default='', help='band structure title')
+    both.add_argument('--dos-title', default='', help='density of states title')
+    
+    compare = commands.add_parser('compare', parents=[options, singleoptions], help='overlay the band structures (and densities of states) of several calculations')
+    compare.add_argument('band', nargs='+', help='.BAND files')
+    compare.add_argument('--doss', nargs='+', default=[], help='.DOSS files, in the same order as the .BAND files')
+    compare.add_argument('--labels', nargs='+', default=None, help='legend entries (default: the .BAND file names)')
+    compare.add_argument('--window', type=float, default=None, metavar='EV', help='plot only the bands within EV eV of each Fermi energy')
+    compare.add_argument('--title', default='', help='band structure title')
+    
+    batch = commands.add_parser('batch', parents=[options, decimateoptions], help='plot every .BAND/.DOSS pair found under directories or glob patterns')
+    batch.add_argument('paths', nargs='+', help='directories to search recursively, glob patterns or files')
+    batch.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    batch.add_argument('--outdir', default=None, help='directory for the figures (default: next to each .BAND file)')
+    
+    watch = commands.add_parser('watch', parents=[options, decimateoptions], help='keep the figures of every .BAND/.DOSS pair under directories up to date as files change')
+    watch.add_argument('paths', nargs='+', help='directories to search recursively, glob patterns or files')
+    watch.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    watch.add_argument('--outdir', default=None, help='directory for the figures (default: next to each .BAND file)')
+    watch.add_argument('--interval', type=float, default=2.0, help='seconds between scans (default: 2)')
+    watch.add_argument('--settle', type=float, default=5.0, help='seconds a changed file must stay unchanged before it is plotted (default: 5)')
+    
+    return parser
+
+
+def main(argv=None):
+    'Command line entry point. Falls back to the interactive prompts when called without arguments.'
+    
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    if len(argv) == 0:
+        interactive()
+        return
+    
+    parser = command_line_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command == 'compare':
+        if args.labels is not None and len(args.labels) != len(args.band):
+            parser.error('give one label for each of the %d .BAND files' % len(args.band))
+        if len(args.doss) not in [0, len(args.band)]:
+            parser.error('give one .DOSS file for each of the %d .BAND files, or none' % len(args.band))
+    
+    if args.command in ['bs', 'both'] and len(args.bands) > 2:
+        print('Error: give one band or a first and last band.')
+        sys.exit(1)
+    
+    if args.command == 'batch':
+        failures = batch_plot(find_bs_dos_pairs(args.paths), args.workers, args.outdir, eV = args.eV, fermienergy = args.absolute, fmt = args.format, decimate = args.decimate, dpi = args.dpi, rasterize = args.rasterize, root = search_root(args.paths))
+        sys.exit(1 if len(failures) > 0 else 0)
+    
+    if args.command == 'watch':
+        try:
+            asyncio.run(watch_pairs(args.paths, args.interval, args.settle, args.workers, args.outdir, eV = args.eV, fermienergy = args.absolute, fmt = args.format, decimate = args.decimate, dpi = args.dpi, rasterize = args.rasterize))
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    if args.headless is True:
+        use_agg()
+    
+    if args.output is None:
+        if args.command == 'compare':
+            args.output = os.path.splitext(args.band[0])[0] + '_compare'
+        else:
+            args.output = os.path.splitext(args.band if args.command != 'dos' else args.doss)[0]
+    
+    display = args.headless is False
+    saved = True
+    
+    if args.command == 'bs':
+        saved = plot_bs(args.band, args.output, args.title, *args.bands, eV = args.eV, fermienergy = args.absolute, fmt = args.format, display = display, window = args.window, decimate = args.decimate, dpi = args.dpi, rasterize = args.rasterize, reconnect = args.reconnect)
+    
+    elif args.command == 'dos':
+        plot_dos(args.doss, args.output, args.title, eV = args.eV, fermienergy = args.absolute, fmt = args.format, display = display, dpi = args.dpi, rasterize = args.rasterize)
+    
+    elif args.command == 'both':
+        saved = plot_bs_dos(args.band, args.doss, args.output, args.bs_title, args.dos_title, *args.bands, eV = args.eV, fermienergy = args.absolute, fmt = args.format, display = display, window = args.window, decimate = args.decimate, dpi = args.dpi, rasterize = args.rasterize, reconnect = args.reconnect)
+    
+    elif args.command == 'compare':
+        plot_compare(args.band, args.doss, args.output, args.title, eV = args.eV, fermienergy = args.absolute, fmt = args.format, display = display, window = args.window, labels = args.labels, dpi = args.dpi, rasterize = args.rasterize)
+    
+    if saved is False:
+        sys.exit(1)
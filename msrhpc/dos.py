@@ -0,0 +1,135 @@
+'Density of states analysis of parsed .DOSS data: integrated electron counts, moments, band centres and Gaussian smearing.'
+
+import numpy as np
+
+from .energy import HARTREE_TO_EV
+from .parse import DosFile
+
+
+def trapezoid_weights(energies):
+    'Weights w such that the trapezium rule integral of f over the energy grid is the dot product of f and w.'
+
+    steps = np.diff(energies)
+
+    weights = np.zeros(len(energies))
+    weights[:-1] += steps / 2
+    weights[1:] += steps / 2
+
+    return weights
+
+
+def cumulative_dos(points):
+    '''Running integral of every projection of .DOSS points (column 0 the energy, the rest projections) from the bottom
+    of the energy grid, by the trapezium rule. Returns an array of shape (n_projections, n_points).'''
+
+    energies = np.asarray(points[0])
+    dos = np.asarray(points[1:])
+
+    cumulative = np.zeros(dos.shape)
+    cumulative[:, 1:] = np.cumsum((dos[:, 1:] + dos[:, :-1]) / 2 * np.diff(energies), axis=1)
+
+    return cumulative
+
+
+def integrated_dos(points, energy=0.0):
+    '''Integral of every projection from the bottom of the energy grid up to energy, linearly interpolated between grid
+    points. With the default 0 and energies relative to the Fermi level this is the occupied electron count.'''
+
+    energies = np.asarray(points[0])
+    cumulative = cumulative_dos(points)
+
+    upper = int(np.clip(np.searchsorted(energies, energy), 1, len(energies) - 1))
+    fraction = np.clip((energy - energies[upper - 1]) / (energies[upper] - energies[upper - 1]), 0, 1)
+
+    return cumulative[:, upper - 1] + fraction * (cumulative[:, upper] - cumulative[:, upper - 1])
+
+
+def dos_moments(points, orders=(0, 1, 2), emin=None, emax=None):
+    '''Raw moments, the integral of E^n * DoS over [emin, emax] (default the whole grid), for every projection and order n.
+    Returns an array of shape (len(orders), n_projections), computed as one matrix product.'''
+
+    energies = np.asarray(points[0])
+    dos = np.asarray(points[1:])
+
+    weights = trapezoid_weights(energies)
+
+    if emin is not None:
+        weights[energies < emin] = 0
+    if emax is not None:
+        weights[energies > emax] = 0
+
+    powers = energies[np.newaxis, :] ** np.asarray(orders)[:, np.newaxis]
+
+    return (powers * weights) @ dos.T
+
+
+def band_centres(points, emin=None, emax=None):
+    '''Band centre (first moment over zeroth, e.g. the d-band centre) and width (square root of the second central
+    moment) of every projection over [emin, emax]. Returns two arrays of length n_projections; empty projections give nan.'''
+
+    norm, first, second = dos_moments(points, (0, 1, 2), emin, emax)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centres = first / norm
+        widths = np.sqrt(np.maximum(second / norm - centres ** 2, 0))
+
+    return centres, widths
+
+
+def smear_dos(points, sigma):
+    '''Re-broadens every projection with a Gaussian of standard deviation sigma (in the energy units of the points)
+    by FFT convolution. A non-uniform energy grid is first interpolated onto a uniform one with the same number of points.
+    Returns new points on the (uniform) grid; the integral of each projection is preserved.'''
+
+    energies = np.asarray(points[0])
+    dos = np.asarray(points[1:])
+    npoints = len(energies)
+
+    steps = np.diff(energies)
+    if not np.allclose(steps, steps[0], rtol=1e-6, atol=0):
+        uniform = np.linspace(energies[0], energies[-1], npoints)
+        dos = np.array([np.interp(uniform, energies, projection) for projection in dos])
+        energies = uniform
+
+    step = energies[1] - energies[0]
+
+    # Kernel out to 5 sigma either side, normalised so the convolution keeps the integral
+    halfwidth = int(np.ceil(5 * sigma / step))
+    offsets = np.arange(-halfwidth, halfwidth + 1) * step
+    kernel = np.exp(-offsets ** 2 / (2 * sigma ** 2))
+    kernel /= kernel.sum()
+
+    # Zero padding to a fast FFT length avoids wrap-around between the ends of the grid
+    length = 1 << int(np.ceil(np.log2(npoints + len(kernel) - 1)))
+    spectrum = np.fft.rfft(dos, length, axis=1) * np.fft.rfft(kernel, length)
+    smeared = np.fft.irfft(spectrum, length, axis=1)[:, halfwidth:halfwidth + npoints]
+
+    return np.vstack((energies, smeared))
+
+
+def analyse_dos_file(filename, emin=None, emax=None, eV=False):
+    '''Per projection electron count up to the Fermi level and band centre and width over [emin, emax] (Hartree,
+    relative to the Fermi level) for one .DOSS file. Returns one dictionary per projection and spin channel; spin is
+    'alpha' or 'beta' for a spin-polarized file and None otherwise.'''
+
+    dosfile = DosFile(filename)
+
+    if dosfile.beta is None:
+        channels = [(None, dosfile.points)]
+    else:
+        # The beta DoS may be written as negative values, so it is counted by magnitude like the alpha DoS
+        channels = [('alpha', dosfile.points), ('beta', np.vstack((dosfile.beta[0], abs(dosfile.beta[1:]))))]
+
+    scale = HARTREE_TO_EV if eV is True else 1
+
+    rows = []
+
+    for spin, points in channels:
+        counts = integrated_dos(points)
+        centres, widths = band_centres(points, emin, emax)
+
+        rows.extend({'file': filename, 'projection': projection + 1, 'spin': spin, 'unit': 'eV' if eV is True else 'Hartree',
+                     'electrons': float(counts[projection]), 'centre': float(centres[projection] * scale),
+                     'width': float(widths[projection] * scale)} for projection in range(len(counts)))
+
+    return rows
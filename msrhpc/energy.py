@@ -0,0 +1,52 @@
+'Energy units and references: Hartree/eV conversion, and shifting between energies relative to the Fermi level and absolute ones.'
+
+import numpy as np
+
+HARTREE_TO_EV = 27.211386245988
+
+
+def hartree_to_ev(energies):
+    'Converts a value or whole array of energies from Hartree to eV.'
+    return np.asarray(energies) * HARTREE_TO_EV
+
+
+def ev_to_hartree(energies):
+    'Converts a value or whole array of energies from eV to Hartree.'
+    return np.asarray(energies) / HARTREE_TO_EV
+
+
+def to_absolute(energies, efermi):
+    'Shifts energies relative to the Fermi level (E-EFERMI) to absolute energies. Both must be in the same unit.'
+    return np.asarray(energies) + efermi
+
+
+def to_relative(energies, efermi):
+    'Shifts absolute energies to energies relative to the Fermi level (E-EFERMI). Both must be in the same unit.'
+    return np.asarray(energies) - efermi
+
+
+def convert_energies(energies, efermi, eV, fermienergy):
+    '''Takes energies as written in .BAND/.DOSS files (Hartree, relative to the Fermi level) and returns a new array
+    shifted to absolute energies if fermienergy is True and converted to eV if eV is True. The input is not modified.'''
+    
+    energies = np.asarray(energies, dtype=np.float64)
+    
+    if fermienergy is True:
+        energies = to_absolute(energies, efermi)
+    
+    if eV is True:
+        energies = hartree_to_ev(energies)
+    
+    return energies
+
+
+def convert_energy_label(label, eV, fermienergy):
+    'Changes an axis label to match the energies returned by convert_energies.'
+    
+    if fermienergy is True:
+        label = label.replace('E-EFERMI', 'ENERGY')
+    
+    if eV is True:
+        label = label.replace('HARTREE', 'eV')
+    
+    return label
@@ -0,0 +1,75 @@
+'Finding .BAND/.DOSS files and pairs in directory trees, naming their figures and detecting changes.'
+
+import glob
+import os
+
+
+def find_files(paths, extension):
+    '''Finds the files ending in extension (in any case, e.g. '.BAND') under the given paths. Each path may be a directory,
+    which is searched recursively, a glob pattern, or a single file. Returns a sorted list without duplicates.'''
+    
+    candidates = []
+    
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, filenames in os.walk(path):
+                candidates.extend(os.path.join(directory, name) for name in filenames)
+        else:
+            candidates.extend(glob.glob(path, recursive=True))
+    
+    return sorted(set(candidate for candidate in candidates if os.path.splitext(candidate)[1].upper() == extension.upper()))
+
+
+def find_bs_dos_pairs(paths):
+    '''Finds .BAND files with a .DOSS file of the same name beside them under the given paths (see find_files).
+    Returns a sorted list of (band, doss) pairs.'''
+    
+    doss = {os.path.splitext(candidate)[0]: candidate for candidate in find_files(paths, '.DOSS')}
+    
+    pairs = []
+    for band in find_files(paths, '.BAND'):
+        stem = os.path.splitext(band)[0]
+        if stem in doss:
+            pairs.append((band, doss[stem]))
+    
+    return pairs
+
+
+def search_root(paths):
+    '''The deepest directory containing everything under the given paths (see find_files): directories as they are,
+    and files and glob patterns by their directory up to the first wildcard.'''
+    
+    directories = []
+    
+    for path in paths:
+        if os.path.isdir(path):
+            directories.append(path)
+        else:
+            # Only the part of a pattern before its first wildcard is a fixed directory
+            parts = os.path.normpath(path).split(os.sep)
+            wildcard = next((index for index, part in enumerate(parts) if glob.has_magic(part)), None)
+            directories.append(os.path.dirname(path) if wildcard is None else os.sep.join(parts[:wildcard]))
+    
+    return os.path.commonpath([os.path.abspath(directory or os.curdir) for directory in directories])
+
+
+def figure_stem(band, outdir=None, root=None):
+    '''Output filename without extension for the figure of a .BAND file: beside it, or in outdir if given. In outdir the
+    path of the file relative to root (default: its own directory) is kept, so files with the same name in different
+    directories of a sweep get separate figures.'''
+    
+    output = os.path.splitext(band)[0]
+    if outdir is not None:
+        root = os.path.dirname(os.path.abspath(band)) if root is None else root
+        output = os.path.join(outdir, os.path.relpath(os.path.abspath(output), os.path.abspath(root)))
+    
+    return output
+
+
+def file_signature(filenames):
+    'Modification times and sizes of files, or None if one of them is missing.'
+    
+    try:
+        return tuple((status.st_mtime_ns, status.st_size) for status in [os.stat(filename) for filename in filenames])
+    except OSError:
+        return None
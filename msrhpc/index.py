@@ -0,0 +1,136 @@
+'Persistent SQLite index of the header metadata and band gaps of a tree of CRYSTAL .BAND and .DOSS files.'
+
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from .analysis import analyse_bands, spin_channels
+from .energy import HARTREE_TO_EV
+from .files import find_files
+from .parse import BandFile, DosFile
+
+schema = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    title TEXT,
+    kpath TEXT,
+    tick_labels TEXT,
+    efermi REAL,
+    spin INTEGER,
+    nbands INTEGER,
+    npoints INTEGER,
+    nprojections INTEGER,
+    metallic INTEGER,
+    gap REAL,
+    direct INTEGER,
+    vbm REAL,
+    cbm REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_gap ON files (gap);
+CREATE INDEX IF NOT EXISTS files_kpath ON files (kpath);
+'''
+
+columns = ['path', 'kind', 'mtime_ns', 'size', 'title', 'kpath', 'tick_labels', 'efermi', 'spin', 'nbands', 'npoints',
+           'nprojections', 'metallic', 'gap', 'direct', 'vbm', 'cbm', 'error']
+
+
+def connect(database):
+    'Opens (creating if needed) the index database and returns the sqlite3 connection, with rows readable by column name.'
+
+    connection = sqlite3.connect(database)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(schema)
+
+    return connection
+
+
+def read_metadata(filename):
+    '''Reads one .BAND or .DOSS file and returns its index row as a dictionary. Band files get their gap, band edges
+    (eV, relative to the Fermi level) and whether the gap is direct from analyse_bands, over both spin channels.
+    A file that cannot be read gets a row with the error, so it is not retried until it changes.
+    No parse cache is written: the index itself only reads a file again when it changes.'''
+
+    status = os.stat(filename)
+    kind = os.path.splitext(filename)[1].upper().lstrip('.')
+
+    row = dict.fromkeys(columns)
+    row.update(path=os.path.abspath(filename), kind=kind, mtime_ns=status.st_mtime_ns, size=status.st_size)
+
+    try:
+        if kind == 'BAND':
+            bsfile = BandFile(filename, cache=False)
+
+            points, bands, spins = spin_channels(bsfile)
+            results = analyse_bands(points, bands, eV=True, spins=spins)
+
+            row.update(title=bsfile.title, kpath=' '.join(bsfile.tick_labels), tick_labels=json.dumps(bsfile.tick_labels),
+                       nbands=bsfile.nbands, npoints=len(bsfile.points[0]), metallic=int(results['metallic']),
+                       gap=results['gap'], vbm=results['vbm'], cbm=results['cbm'],
+                       direct=None if results['direct'] is None else int(results['direct']))
+
+        else:
+            dosfile = DosFile(filename, cache=False)
+            row.update(title=dosfile.title, nprojections=dosfile.nprojections, npoints=len(dosfile.points[0]))
+            bsfile = dosfile
+
+        row.update(spin=2 if bsfile.beta is not None else 1,
+                   efermi=None if bsfile.efermi is None else bsfile.efermi * HARTREE_TO_EV)
+
+    except Exception as error:
+        row['error'] = '%s: %s' % (type(error).__name__, error)
+
+    return row
+
+
+def scan(connection, paths, workers=None):
+    '''Brings the index up to date with the .BAND and .DOSS files under paths (see find_files). Only new files and files
+    whose modification time or size changed are read, in a pool of worker processes; rows of files that no longer exist
+    are removed. Returns the rows read, the number of unchanged files and the number of rows removed.'''
+
+    known = {row['path']: (row['mtime_ns'], row['size']) for row in connection.execute('SELECT path, mtime_ns, size FROM files')}
+
+    changed = []
+    unchanged = 0
+
+    for filename in find_files(paths, '.BAND') + find_files(paths, '.DOSS'):
+        status = os.stat(filename)
+        if known.get(os.path.abspath(filename)) == (status.st_mtime_ns, status.st_size):
+            unchanged += 1
+        else:
+            changed.append(filename)
+
+    removed = [path for path in known if not os.path.exists(path)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = list(pool.map(read_metadata, changed, chunksize=8))
+
+    with connection:
+        connection.executemany('INSERT OR REPLACE INTO files (%s) VALUES (%s)' % (', '.join(columns), ', '.join('?' * len(columns))),
+                               [[row[column] for column in columns] for row in rows])
+        connection.executemany('DELETE FROM files WHERE path = ?', [[path] for path in removed])
+
+    return rows, unchanged, len(removed)
+
+
+def query(connection, kind=None, min_gap=None, max_gap=None, metallic=None, direct=None, kpath=None, title=None):
+    '''Returns the index rows matching every condition given: the file kind ('BAND' or 'DOSS'), a gap range in eV,
+    metallic or direct True/False, an exact k-path (tick labels separated by spaces) and a title containing title.
+    Files that could not be read are left out.'''
+
+    conditions = ['error IS NULL']
+    values = []
+
+    for condition, value in [('kind = ?', kind), ('gap >= ?', min_gap), ('gap <= ?', max_gap), ('kpath = ?', kpath),
+                             ('metallic = ?', None if metallic is None else int(metallic)),
+                             ('direct = ?', None if direct is None else int(direct)),
+                             ("title LIKE '%' || ? || '%'", title)]:
+        if value is not None:
+            conditions.append(condition)
+            values.append(value)
+
+    return connection.execute('SELECT * FROM files WHERE %s ORDER BY path' % ' AND '.join(conditions), values).fetchall()
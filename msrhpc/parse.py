@@ -0,0 +1,480 @@
+'''Reading CRYSTAL .BAND and .DOSS files: one-pass chunked parsing into NumPy arrays with spin blocks split out,
+the on-disk parse cache, and the BandFile/DosFile loaders. Imports only NumPy, so it is cheap to load in workers.'''
+
+import functools
+import json
+import os
+
+import numpy as np
+
+from .energy import ev_to_hartree, hartree_to_ev
+from .transform import reconnect_bands
+
+
+def read_blocks(stream, header=None, columns=None, chunksize=4096, size=None):
+    '''Reads the numeric blocks of a .BAND or .DOSS file in one pass. Returns a list of float64 arrays of shape
+    (n_columns, n_points), one per block: a single block for a closed-shell calculation, and the alpha and then the
+    beta block for a spin-polarized one. A new block starts after a blank, & or @/# line that follows data, or where
+    the k-distance or energy in column 0 goes back down. Empty blocks are dropped.
+    Lines starting with @ or # are passed to header(line) if given, so labels can be collected in the same pass.
+    Data lines are converted chunksize rows at a time into a preallocated ColumnBuffer per block, so the text is never
+    held in memory all at once. If columns is a list of column indices, only those columns are converted and kept, in that order.
+    size is the file size in bytes if known; it is used to estimate the number of points from the first chunk.'''
+    
+    blocks = []
+    points = ColumnBuffer()
+    chunk = []
+    
+    # Restarts of column 0 can only be seen if it is kept, and kept first
+    ordered = columns is None or (len(columns) > 0 and columns[0] == 0)
+    
+    for line in stream:
+        separator = line[0] in ['@', '#', '&'] or line.isspace()
+        
+        if separator is False:
+            chunk.append(line)
+        
+        elif line[0] in ['@', '#'] and header is not None:
+            header(line)
+        
+        if len(chunk) == chunksize or (separator is True and len(chunk) > 0):
+            if points.data is None and size is not None and len(blocks) == 0:
+                points.capacity = int(size * len(chunk) / sum([len(line) for line in chunk])) + 1
+            
+            points = store_blocks(blocks, points, convert_rows(chunk, columns), ordered)
+            chunk = []
+        
+        if separator is True and points.npoints > 0:
+            blocks.append(points.finish())
+            points = ColumnBuffer(blocks[-1].shape[1])
+    
+    points = store_blocks(blocks, points, convert_rows(chunk, columns), ordered)
+    
+    if points.npoints > 0 or len(blocks) == 0:
+        blocks.append(points.finish(0 if columns is None else len(columns)))
+    
+    return blocks
+
+
+def store_blocks(blocks, points, values, ordered=True):
+    '''Stores converted rows in the ColumnBuffer points, starting a new buffer wherever column 0 decreases if ordered is True.
+    Finished blocks are appended to blocks, and the next buffer is sized like the last one, as the spin blocks of a file
+    have the same number of points. Returns the buffer of the block still being read.'''
+    
+    if ordered is True and len(values) > 0:
+        restarts = (np.flatnonzero(np.diff(values[:, 0]) < 0) + 1).tolist()
+        
+        if points.npoints > 0 and values[0, 0] < points.columns()[0, points.npoints - 1]:
+            restarts = [0] + restarts
+        
+        for start, stop in zip([0] + restarts, restarts):
+            points.store(values[start:stop])
+            blocks.append(points.finish())
+            points = ColumnBuffer(blocks[-1].shape[1])
+        
+        values = values[([0] + restarts)[-1]:]
+    
+    points.store(values)
+    
+    return points
+
+
+def convert_rows(chunk, columns=None):
+    '''Converts a list of data lines to a float64 array of shape (n_lines, n_columns), keeping only the listed columns
+    if columns is given. Raises IndexError if a column is not in the file.'''
+    
+    if len(chunk) > 0 and columns is not None and len(columns) > 0 and np.amax(columns) >= len(chunk[0].split()):
+        raise IndexError('column %d is not in the file' % np.amax(columns))
+    
+    if len(chunk) == 0:
+        return np.empty((0, 0))
+    
+    return np.loadtxt(chunk, usecols=None if columns is None else list(columns), ndmin=2)
+
+
+class ColumnBuffer:
+    '''Preallocated float64 storage for an (n_columns, n_points) block that is filled a chunk of rows at a time.
+    It grows by doubling if the expected capacity turns out too small, and is trimmed in place when finished,
+    so peak memory stays close to the size of the result.'''
+    
+    def __init__(self, capacity=0):
+        self.capacity = capacity
+        self.data = None
+        self.ncolumns = 0
+        self.npoints = 0
+    
+    def columns(self):
+        'The buffer as a (n_columns, capacity) view.'
+        return self.data.reshape(self.ncolumns, self.capacity)
+    
+    def store(self, values):
+        'Stores an (n_rows, n_columns) array of converted rows after the points already held.'
+        
+        nvalues = len(values)
+        
+        if nvalues == 0:
+            return
+        
+        if self.data is None:
+            self.ncolumns = values.shape[1]
+            self.capacity = int(np.amax([self.capacity, nvalues]))
+            self.data = np.empty(self.ncolumns * self.capacity)
+        
+        elif self.npoints + nvalues > self.capacity:
+            # Doubling keeps the total copying linear in the file size
+            old = self.columns()
+            self.capacity = int(np.amax([2 * self.capacity, self.npoints + nvalues]))
+            self.data = np.empty(self.ncolumns * self.capacity)
+            self.columns()[:, :self.npoints] = old[:, :self.npoints]
+        
+        self.columns()[:, self.npoints:self.npoints + nvalues] = values.T
+        self.npoints += nvalues
+    
+    def finish(self, ncolumns=0):
+        'Returns the stored points as a contiguous (n_columns, n_points) array. ncolumns is the width used if nothing was stored.'
+        
+        if self.data is None:
+            return np.empty((ncolumns, 0))
+        
+        npoints = self.npoints
+        
+        if npoints < self.capacity:
+            # Move each column down over the unused space, then release the tail
+            for column in range(1, self.ncolumns):
+                start = column * self.capacity
+                self.data[column * npoints:(column + 1) * npoints] = self.data[start:start + npoints]
+            
+            self.data.resize(self.ncolumns * npoints, refcheck=False)
+            self.capacity = npoints
+        
+        return self.columns()
+
+
+def cache_paths(filename):
+    'Paths of the .npy points and .json header cache files kept next to a .BAND or .DOSS file.'
+    return filename + '.cache.npy', filename + '.cache.json'
+
+
+def cache_key(filename):
+    'Identifies the current contents of a file by its path, modification time and size.'
+    status = os.stat(filename)
+    return {'path': os.path.abspath(filename), 'mtime_ns': status.st_mtime_ns, 'size': status.st_size}
+
+
+def load_cache(filename):
+    '''Returns (points, header) for filename from its cache, with the points memory-mapped read-only.
+    Returns None if there is no cache or it was written for a different version of the file.'''
+    
+    npypath, jsonpath = cache_paths(filename)
+    
+    try:
+        with open(jsonpath, 'r') as stream:
+            meta = json.load(stream)
+        
+        if meta['key'] != cache_key(filename):
+            return None
+        
+        points = np.load(npypath, mmap_mode='r')
+        
+        if list(points.shape) != meta['shape']:
+            return None
+    
+    except (OSError, ValueError, KeyError):
+        return None
+    
+    return points, meta['header']
+
+
+def save_cache(filename, points, header, key):
+    '''Writes the points and header of filename to its cache under key, the cache_key taken before the file was read.
+    Does nothing if the file has changed since (e.g. a running job appended to it) or the directory is not writable.'''
+    
+    npypath, jsonpath = cache_paths(filename)
+    meta = {'key': key, 'shape': list(points.shape), 'header': header}
+    
+    try:
+        if cache_key(filename) != key:
+            return
+    except OSError:
+        return
+    
+    try:
+        # Write to temporary files and rename, so a reader never sees a half-written cache
+        with open(npypath + '.tmp', 'wb') as stream:
+            np.save(stream, points)
+        os.replace(npypath + '.tmp', npypath)
+        
+        with open(jsonpath + '.tmp', 'w') as stream:
+            json.dump(meta, stream)
+        os.replace(jsonpath + '.tmp', jsonpath)
+    
+    except OSError:
+        pass
+
+
+class CrystalFile:
+    '''Reading and caching shared by BandFile and DosFile. Subclasses set their header attributes,
+    list them in header_fields, and provide read_header(line).
+    points holds the (alpha) data block. For a spin-polarized file beta holds the beta block, with the same columns
+    and number of points; it is None otherwise. Raises ValueError if the file has more than two blocks.
+    If columns is a list of column indices only those columns are kept in points. The cache always holds
+    every column, so a selection is sliced from it when it is up to date, and is not written otherwise.'''
+    
+    header_fields = []
+    
+    def __init__(self, filename, cache=True, columns=None):
+        self.filename = filename
+        self.beta = None
+        
+        cached = load_cache(filename) if cache is True else None
+        
+        if cached is not None:
+            points, header = cached
+            for field in self.header_fields:
+                setattr(self, field, header[field])
+            
+            # A spin-polarized cache holds the alpha and beta blocks stacked along a first axis
+            if points.ndim == 3:
+                self.points, self.beta = points
+            else:
+                self.points = points
+            
+            if columns is not None:
+                self.points = self.points[list(columns)]
+                if self.beta is not None:
+                    self.beta = self.beta[list(columns)]
+        
+        else:
+            # The key is taken before reading, so data read from a file that is still growing is never cached as complete
+            key = cache_key(filename)
+            
+            with open(filename, 'r') as stream:
+                blocks = read_blocks(stream, header=self.read_header, columns=columns, size=os.path.getsize(filename))
+            
+            if len(blocks) > 2:
+                raise ValueError('%s has %d data blocks, expected one or two spin blocks' % (filename, len(blocks)))
+            
+            if len(blocks) == 2 and blocks[0].shape != blocks[1].shape:
+                raise ValueError('the alpha and beta blocks of %s have different shapes' % filename)
+            
+            self.points = blocks[0]
+            
+            if len(blocks) == 2:
+                self.beta = blocks[1]
+            
+            if cache is True and columns is None:
+                save_cache(filename, self.points if self.beta is None else np.stack([self.points, self.beta]), self.header(), key)
+    
+    @classmethod
+    def from_arrays(cls, filename, points, header, beta=None):
+        'Builds an instance from already parsed points (and beta block) and header attributes (see header()), without reading filename.'
+        
+        self = cls.__new__(cls)
+        self.filename = filename
+        self.points = points
+        self.beta = beta
+        
+        for field in cls.header_fields:
+            setattr(self, field, header[field])
+        
+        return self
+    
+    @property
+    def spinpolarized(self):
+        return self.beta is not None
+    
+    def header(self):
+        'Header attributes as a dictionary.'
+        return {field: getattr(self, field) for field in self.header_fields}
+
+
+class BandFile(CrystalFile):
+    '''Reads a .BAND file once, collecting the band points, tick labels and positions, axis labels, title and Fermi energy.
+    bands is an optional list of band numbers (1 for the first) to keep; points then holds the k-distance followed by
+    those bands in the order given, and the others are never converted. Raises IndexError if a band is not in the file.
+    window keeps only the bands (of those, if bands is given) that come within window eV of the Fermi energy in either spin channel.
+    With reconnect the bands of each spin channel are reordered into smooth branches through crossings (see
+    reconnect_bands) before any are selected, so band numbers then count branches by their energy at the first k-point.
+    The numbers of the bands held in points (and beta, for a spin-polarized file) are listed in the bands attribute.'''
+    
+    header_fields = ['tick_labels', 'tick_positions', 'xlabel', 'ylabel', 'title', 'efermi']
+    
+    def __init__(self, filename, cache=True, bands=None, window=None, reconnect=False):
+        self.tick_labels = []
+        self.tick_positions = []
+        self.xlabel = 'k-points'
+        self.ylabel = ''
+        self.title = ''
+        self.efermi = None
+        
+        columns = None if bands is None else [0] + list(bands)
+        
+        # Crossings with bands that are not selected also need reconnecting, so every band is read
+        CrystalFile.__init__(self, filename, cache, None if reconnect is True else columns)
+        
+        if reconnect is True:
+            self.points = reconnect_bands(self.points, self.tick_positions)
+            if self.beta is not None:
+                self.beta = reconnect_bands(self.beta, self.tick_positions)
+            
+            if columns is not None:
+                self.points = self.points[columns]
+                if self.beta is not None:
+                    self.beta = self.beta[columns]
+        
+        if window is not None:
+            rows = bands_in_window(self.points, window)
+            
+            # A band is kept if either spin channel comes within the window
+            if self.beta is not None:
+                rows = sorted(set(rows) | set(bands_in_window(self.beta, window)))
+                self.beta = self.beta[[0] + list(rows)]
+            
+            self.points = self.points[[0] + list(rows)]
+            
+            # The rows are positions among the bands read, which are only the band numbers if all were read
+            bands = rows if bands is None else [list(bands)[row - 1] for row in rows]
+        
+        self.bands = list(range(1, len(self.points))) if bands is None else list(bands)
+    
+    def read_header(self, line):
+        'Picks the labels and Fermi energy out of one header line.'
+        
+        if 'XAXIS TICKLABEL    ' in line:
+            self.tick_labels.append(line.split()[-1].split('"')[1])
+        
+        elif 'XAXIS TICK     ' in line:
+            self.tick_positions.append(float(line.split()[-1]))
+        
+        elif 'YAXIS LABEL ' in line:
+            self.ylabel = line.split('"')[-2]
+        
+        elif 'TITLE ' in line:
+            self.title = line.split('"')[-2]
+        
+        elif '# EFERMI' in line:
+            self.efermi = float(line.split()[-1])
+    
+    @classmethod
+    def from_arrays(cls, filename, points, header, beta=None, bands=None):
+        'Builds an instance from already parsed points and header attributes; bands lists the band numbers of the rows (default 1, 2, ...).'
+        
+        self = super().from_arrays(filename, points, header, beta)
+        self.bands = list(range(1, len(points))) if bands is None else list(bands)
+        
+        return self
+    
+    @property
+    def nbands(self):
+        return len(self.points) - 1
+    
+    def labelslist(self):
+        'Labels in the list layout returned by get_bs_labels.'
+        return [list(self.tick_labels), list(self.tick_positions), self.xlabel, self.ylabel, self.title]
+
+
+class DosFile(CrystalFile):
+    '''Reads a .DOSS file once, collecting the DoS points, axis labels and Fermi energy.
+    projections is an optional list of projection numbers (1 for the first) to keep; points then holds the energy followed by
+    those projections in the order given, and the others are never converted. Raises IndexError if a projection is not in the file.
+    The beta projections of a spin-polarized file are in beta, in the same layout.'''
+    
+    header_fields = ['xlabel', 'ylabel', 'title', 'efermi']
+    
+    def __init__(self, filename, cache=True, projections=None):
+        self.xlabel = ''
+        self.ylabel = ''
+        self.title = 'Density of States'
+        self.efermi = None
+        
+        columns = None if projections is None else [0] + list(projections)
+        
+        CrystalFile.__init__(self, filename, cache, columns)
+    
+    def read_header(self, line):
+        'Picks the labels and Fermi energy out of one header line.'
+        
+        if 'XAXIS LABEL ' in line:
+            self.xlabel = line.split('"')[-2]
+        
+        elif 'YAXIS LABEL ' in line:
+            self.ylabel = line.split('"')[-2].replace('DENSITY OF STATES', 'DoS')
+        
+        elif '# EFERMI' in line:
+            self.efermi = float(line.split()[-1])
+    
+    @property
+    def nprojections(self):
+        return len(self.points) - 1
+    
+    def labelslist(self):
+        'Labels in the list layout returned by get_dos_labels.'
+        return [self.xlabel, self.ylabel, self.title]
+
+
+@functools.lru_cache(maxsize=32)
+def cached_file(cls, path, mtime_ns, size):
+    'Keeps the last files read by open_file in memory. The modification time and size are part of the key, so a changed file is read again.'
+    return cls(path)
+
+
+def open_file(cls, filename):
+    '''Returns the BandFile or DosFile (cls) for filename with all bands or projections, read only once per process
+    while the file is unchanged. The instance is shared between callers, so its points must not be modified.'''
+    
+    key = cache_key(filename)
+    return cached_file(cls, key['path'], key['mtime_ns'], key['size'])
+
+
+def bands_in_window(points, window):
+    '''Takes .BAND points (energies relative to the Fermi level, in Hartree) and returns the numbers of the bands
+    that come within window eV of the Fermi level, using the minimum and maximum of every band at once.'''
+    
+    limit = ev_to_hartree(window)
+    energies = points[1:]
+    
+    inside = (np.amax(energies, axis=1) >= -limit) & (np.amin(energies, axis=1) <= limit)
+    
+    return (np.flatnonzero(inside) + 1).tolist()
+
+
+def get_bs_points(filename, cache=True, bands=None):
+    'Takes a band structure .BAND output file and returns the points to be plotted. Column 0 is the k-distance, the rest are bands (all, or the numbers listed in bands).'
+    return BandFile(filename, cache, bands).points
+
+
+def get_bs_labels(filename):
+    'Retrieves relevant labels from band structure file.'
+    return BandFile(filename).labelslist()
+
+
+def get_dos_points(filename, cache=True, projections=None):
+    'Gets points to be plotted from .DOSS file. Column 0 is the energy, the rest are projections (all, or the numbers listed in projections).'
+    return DosFile(filename, cache, projections).points
+
+
+def get_dos_labels(filename):
+    'Retrieves relevant labels from density of states file.'
+    return DosFile(filename).labelslist()
+
+
+def getfermienergy(filename, eV, prnt):
+    'Extracts Fermi energy from a band structure or density of states file'
+    
+    with open(filename, 'r') as stream:
+        
+        for line in stream:
+            if '# EFERMI' in line:
+                efermi = float(line.split()[-1])
+                
+        if eV is True:
+            unit = 'eV'
+            efermi = hartree_to_ev(efermi)
+            
+        else:
+            unit = 'Hartrees'
+        
+        if prnt is True:
+            print('Fermi Energy:', efermi, unit)
+        
+    return efermi
@@ -0,0 +1,530 @@
+'''Matplotlib figures of band structures and densities of states. matplotlib is imported on first use through
+LazyModule, so importing this module (or the batch and command line modules) does not load it or pick a backend.'''
+
+import importlib
+import os
+
+import numpy as np
+
+from .energy import convert_energies, convert_energy_label
+from .parse import BandFile, DosFile, bands_in_window, open_file
+from .transform import align_kpath, decimate_bands
+
+
+class LazyModule:
+    'Stands in for a module that is imported on first attribute access.'
+    
+    def __init__(self, name):
+        self.name = name
+        self.module = None
+    
+    def __getattr__(self, attribute):
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        return getattr(self.module, attribute)
+
+
+plt = LazyModule('matplotlib.pyplot')
+mcollections = LazyModule('matplotlib.collections')
+
+
+def use_agg():
+    '''Selects the non-interactive Agg backend, for headless runs and as the initializer of worker processes.
+    Called before pyplot is first imported, it keeps any GUI toolkit from being loaded.'''
+    
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def plot_lines(ax, xvalues, yvalues, **kwargs):
+    '''Draws many lines on ax as one LineCollection instead of one Line2D each, which is much faster for thousands of bands.
+    xvalues and yvalues are arrays of shape (n_points,) or (n_lines, n_points); a 1D array is shared by every line.
+    Without a color keyword the lines take successive colours from the property cycle, as separate plot() calls would.'''
+    
+    xvalues, yvalues = np.broadcast_arrays(np.atleast_2d(xvalues), np.atleast_2d(yvalues))
+    segments = np.stack((xvalues, yvalues), axis=-1)
+    nlines = len(segments)
+    
+    if 'color' not in kwargs and 'colors' not in kwargs:
+        cyclecolors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        kwargs['colors'] = [cyclecolors[i % len(cyclecolors)] for i in range(nlines)]
+    
+    # Match the line ends and corners of Line2D
+    kwargs.setdefault('capstyle', plt.rcParams['lines.solid_capstyle'])
+    kwargs.setdefault('joinstyle', plt.rcParams['lines.solid_joinstyle'])
+    
+    lines = mcollections.LineCollection(segments, **kwargs)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    
+    return lines
+
+
+def decimation_buckets(ax, decimate):
+    'Number of decimate_bands buckets for ax: the width of the axes in pixels if decimate is True, or decimate itself if it is a number.'
+    
+    if decimate is True:
+        return max(int(ax.get_window_extent().width), 1)
+    
+    return int(decimate)
+
+
+# CRYSTAL labels of the graphene Gamma-X-M-K-Gamma path, drawn as the symbols of the special points
+graphene_kpath = ['(0,0,0)/6', '(3,0,0)/6', '(3,3,0)/6', '(2,2,0)/6', '(0,0,0)/6']
+graphene_symbols = [r'$\Gamma$', 'X', 'M', 'K', r'$\Gamma$']
+
+
+def set_kpath_ticks(ax, tick_positions, tick_labels):
+    'Puts the k-path ticks on ax: the symbols of the graphene path, or the CRYSTAL labels rotated for any other path.'
+    
+    ax.set_xticks(tick_positions)
+    
+    if list(tick_labels) == graphene_kpath:
+        ax.set_xticklabels(graphene_symbols, rotation=0, horizontalalignment='center')
+    else:
+        ax.set_xticklabels(tick_labels, rotation=30, horizontalalignment='right')
+
+
+class BsDosTemplate:
+    '''The two-panel band structure and DoS figure of plot_bs_dos, built once and reused.
+    update() only swaps the line data, limits, ticks and labels, so a batch of similar systems
+    does not pay for creating the figure, axes, spines and layout every time.'''
+    
+    def __init__(self):
+        self.fig, self.axes = plt.subplots(nrows = 1, ncols = 2, figsize=(8, 5), sharey=True)
+        self.fig.subplots_adjust(wspace=0)
+        self.layout = None
+        
+        # Band structure panel
+        
+        self.bsfermiline, = self.axes[0].plot([], [], color ='red')
+        self.bslines = plot_lines(self.axes[0], np.zeros(0), np.zeros((0, 0)), color='black')
+        self.bsbetalines = plot_lines(self.axes[0], np.zeros(0), np.zeros((0, 0)), color='C0', linestyle='dashed')
+        self.ticklines = mcollections.LineCollection([], colors=plt.rcParams['lines.color'], transform=self.axes[0].get_xaxis_transform())
+        self.axes[0].add_collection(self.ticklines, autolim=False)
+        
+        self.axes[0].spines['right'].set_visible(False)
+        self.axes[0].spines['left'].set_visible(False)
+        
+        # Density of states panel
+        
+        self.dosfermiline, = self.axes[1].plot([], [], color ='red')
+        self.doslines = plot_lines(self.axes[1], np.zeros((0, 0)), np.zeros(0))
+        self.dosbetalines = plot_lines(self.axes[1], np.zeros((0, 0)), np.zeros(0))
+        
+        self.axes[1].tick_params(left = False)
+    
+    def update(self, bsfile, dosfile, bstitlestring, dostitlestring, eV, fermienergy, decimate=None):
+        '''Draws the bands of a BandFile and the projections of a DosFile into the figure.
+        For spin-polarized files the beta bands are drawn dashed and the beta DoS is mirrored to the left of zero.
+        decimate thins out dense k-paths with decimate_bands before drawing: True for one bucket per pixel, or a number of buckets.'''
+        
+        bsxaxis = bsfile.points[0]
+        bslinex = bsxaxis
+        bsenergies = bsfile.points[1:]
+        betaenergies = np.zeros((0, len(bsxaxis))) if bsfile.beta is None else bsfile.beta[1:]
+        
+        if decimate is not None:
+            nbuckets = decimation_buckets(self.axes[0], decimate)
+            betalinex, betaenergies = decimate_bands(bsxaxis, betaenergies, nbuckets)
+            bslinex, bsenergies = decimate_bands(bsxaxis, bsenergies, nbuckets)
+        else:
+            betalinex = bsxaxis
+        
+        bsenergies = convert_energies(bsenergies, bsfile.efermi, eV, fermienergy)
+        betaenergies = convert_energies(betaenergies, bsfile.efermi, eV, fermienergy)
+        dospoints = dosfile.points
+        dosbeta = np.zeros((len(dospoints), 0)) if dosfile.beta is None else dosfile.beta
+        dosxaxis = convert_energies(dospoints[0], bsfile.efermi, eV, fermienergy)
+        FermiEnergy = float(convert_energies(0, bsfile.efermi, eV, fermienergy))
+        
+        # Band structure panel
+        
+        self.bsfermiline.set_data([bsxaxis[0], bsxaxis[-1]], [FermiEnergy, FermiEnergy])
+        self.bslines.set_segments(np.stack(np.broadcast_arrays(bslinex, bsenergies), axis=-1))
+        self.bsbetalines.set_segments(np.stack(np.broadcast_arrays(betalinex, betaenergies), axis=-1))
+        self.ticklines.set_segments([[(tick, 0), (tick, 1)] for tick in bsfile.tick_positions])
+        
+        bsxlimit = np.amax(bsxaxis)
+        self.axes[0].set_xlim(-0.01, bsxlimit+0.01)
+        
+        self.axes[0].set_xlabel(bsfile.xlabel)
+        self.axes[0].set_ylabel(convert_energy_label(bsfile.ylabel, eV, fermienergy))
+        
+        #Generating correct labels
+        rotated = list(bsfile.tick_labels) != graphene_kpath
+        set_kpath_ticks(self.axes[0], bsfile.tick_positions, bsfile.tick_labels)
+        
+        if len(bstitlestring) > 0:
+            self.axes[0].set_title(bstitlestring)
+        else:
+            self.axes[0].set_title('Band Structure')
+        
+        # Density of states panel
+        
+        maxdosval = np.amax(dospoints[len(dospoints)-1])
+        minbetaval = -np.amax(abs(dosbeta[-1]), initial=0)
+        self.dosfermiline.set_data([minbetaval, maxdosval], [FermiEnergy, FermiEnergy])
+        
+        self.doslines.set_segments(np.stack(np.broadcast_arrays(dospoints[1:], dosxaxis), axis=-1))
+        cyclecolors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        self.doslines.set_color([cyclecolors[i % len(cyclecolors)] for i in range(len(dospoints) - 1)])
+        
+        # The beta DoS is drawn as negative values, whichever sign the file uses
+        self.dosbetalines.set_segments(np.stack(np.broadcast_arrays(-abs(dosbeta[1:]), convert_energies(dosbeta[0], bsfile.efermi, eV, fermienergy)), axis=-1))
+        self.dosbetalines.set_color([cyclecolors[i % len(cyclecolors)] for i in range(len(dosbeta) - 1)])
+        
+        dosxlimit = np.amax(dospoints[-1])
+        self.axes[1].set_xlim(np.floor(minbetaval), np.ceil(dosxlimit))
+        
+        self.axes[1].set_xlabel(convert_energy_label(dosfile.ylabel, eV, fermienergy))
+        
+        if len(dostitlestring) > 0:
+            self.axes[1].set_title(dostitlestring)
+        else:
+            self.axes[1].set_title(dosfile.title)
+        
+        # The shared energy axis covers the bands, the DoS and the Fermi level, with the default 5% margins
+        
+        ymin = np.amin([np.amin(bsenergies), np.amin(betaenergies, initial=np.inf), np.amin(dosxaxis), FermiEnergy])
+        ymax = np.amax([np.amax(bsenergies), np.amax(betaenergies, initial=-np.inf), np.amax(dosxaxis), FermiEnergy])
+        margin = plt.rcParams['axes.ymargin'] * (ymax - ymin)
+        self.axes[0].set_ylim(ymin - margin, ymax + margin)
+        
+        # Laying out needs a full draw, so it is only redone when the tick labels change between upright and rotated
+        
+        if self.layout != rotated:
+            self.fig.tight_layout()
+            self.layout = rotated
+    
+    def save(self, filename, fmt='png', dpi=None, rasterize=False):
+        '''Saves the figure to filename with the extension fmt. If rasterize is True the band and DoS lines are drawn as
+        an image at dpi (default savefig.dpi) inside vector formats, while the axes, ticks and labels stay vector.
+        The plot functions take the same fmt, dpi and rasterize options, and only open a window if display is True.'''
+        
+        for lines in [self.bslines, self.bsbetalines, self.doslines, self.dosbetalines]:
+            lines.set_rasterized(rasterize)
+        
+        self.fig.savefig(filename + '.' + fmt, dpi=dpi)
+
+
+def read_band_selection(filenamebs, argv, window=None, reconnect=False):
+    '''Reads a .BAND file keeping only the bands chosen by the optional arguments of plot_bs and plot_bs_dos:
+    none for all bands, one band, or a first and last band. Instead of band numbers, window keeps the bands
+    within window eV of the Fermi energy. reconnect reorders the bands into smooth branches through crossings first.
+    Prints an error and returns None for a bad selection.'''
+    
+    # Dealing with Band selection inputs (0, 1 or 2)
+    
+    if len(argv) == 2:
+        bands = range(argv[0], argv[1] + 1)
+    
+    elif len(argv) == 1:
+        bands = [argv[0]]
+    
+    else:
+        bands = None
+    
+    # Dealing with bad inputs
+    
+    if bands is not None and len(bands) > 0 and bands[0] < 1:
+        print('Error: start band plotting from 1.')
+        return None
+    
+    if bands is not None and window is not None:
+        print('Error: choose bands or an energy window, not both.')
+        return None
+    
+    try:
+        bsfile = BandFile(filenamebs, bands=bands, window=window, reconnect=reconnect)
+    
+    except IndexError:
+        print('Error: the file does not contain that many bands.')
+        return None
+    
+    if bsfile.nbands == 0:
+        print('Error: no bands to plot.')
+        return None
+    
+    return bsfile
+
+
+def plot_bs_dos(filenamebs, filenamedos, filename, bstitlestring, dostitlestring, *argv, eV, fermienergy, fmt='png', display=True, template=None, window=None, decimate=None, dpi=None, rasterize=False, reconnect=False):#, labels):
+    '''Plots DoS and given bands from BS side by side. Can plot one, all or a specified range of bands (see read_band_selection).
+    Draws into template if a BsDosTemplate is given; the drawing and saving options are those of its update and save.
+    Returns True once the figure is saved, or False after printing an error for a bad band selection.'''
+    
+    if len(argv) > 2:
+        print('Error: too many arguments.')
+    
+    else:
+        
+        # Getting the band structure and DoS data, reading only the selected bands
+        
+        bsfile = read_band_selection(filenamebs, argv, window, reconnect)
+        
+        if bsfile is not None:
+            
+            dosfile = DosFile(filenamedos)
+            
+            if template is None:
+                bsdosfigure = BsDosTemplate()
+            else:
+                bsdosfigure = template
+            
+            bsdosfigure.update(bsfile, dosfile, bstitlestring, dostitlestring, eV, fermienergy, decimate)
+            bsdosfigure.save(filename, fmt, dpi, rasterize)
+            
+            if display is True:
+                plt.show()
+            elif template is None:
+                plt.close(bsdosfigure.fig)
+            
+            return True
+    
+    return False
+
+
+def plot_bs(filenamebs, filename, titlestring, *argv, eV, fermienergy, fmt='png', display=True, window=None, decimate=None, dpi=None, rasterize=False, reconnect=False):
+    '''Takes a band structure file .BAND and plots the BS with matplotlib, with the options of plot_bs_dos.
+    Returns True once the figure is saved, or False after printing an error for a bad band selection.'''
+    
+    if len(argv) > 2:
+        print('Error: too many arguments.')
+    
+    else:
+        
+        # Getting the band structure data, reading only the selected bands
+        
+        bsfile = read_band_selection(filenamebs, argv, window, reconnect)
+        
+        if bsfile is not None:
+        
+            # Dealing with FermiEnergy and eV inputs - shifting, changing units and labels
+            
+            bsxaxis = bsfile.points[0]
+            FermiEnergy = float(convert_energies(0, bsfile.efermi, eV, fermienergy))
+            
+            bsylabel = convert_energy_label(bsfile.ylabel, eV, fermienergy)
+    
+            # Plotting the Band Structure
+        
+            fig = plt.figure(figsize=(4, 5))
+        
+            bszeropoints = np.linspace(FermiEnergy, FermiEnergy, len(bsxaxis))
+            plt.plot(bsxaxis, bszeropoints, color ='red')
+            
+            bslinex = bsxaxis
+            bsenergies = bsfile.points[1:]
+            
+            if decimate is not None:
+                bslinex, bsenergies = decimate_bands(bsxaxis, bsenergies, decimation_buckets(plt.gca(), decimate))
+        
+            plot_lines(plt.gca(), bslinex, convert_energies(bsenergies, bsfile.efermi, eV, fermienergy), color='black', rasterized=rasterize)
+            
+            # Spin-polarized files: beta bands dashed
+            
+            if bsfile.beta is not None:
+                betalinex = bsxaxis
+                betaenergies = bsfile.beta[1:]
+                
+                if decimate is not None:
+                    betalinex, betaenergies = decimate_bands(bsxaxis, betaenergies, decimation_buckets(plt.gca(), decimate))
+                
+                plot_lines(plt.gca(), betalinex, convert_energies(betaenergies, bsfile.efermi, eV, fermienergy), color='C0', linestyle='dashed', rasterized=rasterize)
+    
+            for b in range(0, len(bsfile.tick_positions)):
+                plt.axvline(x = bsfile.tick_positions[b], label=bsfile.tick_labels[b])
+    
+            bsxlimit = np.amax(bsxaxis)
+            plt.xlim(-0.01, bsxlimit+0.01)
+    
+            plt.xlabel(bsfile.xlabel)
+            plt.ylabel(bsylabel)
+            plt.title(bsfile.title)
+            
+            #spines['right'].set_visible(False)
+            #spines['left'].set_visible(False)
+            
+            #Generating correct labels
+            set_kpath_ticks(plt.gca(), bsfile.tick_positions, bsfile.tick_labels)
+    
+            if len(titlestring) > 0:
+                plt.title(titlestring)
+            else:
+                plt.title('Band Structure')
+
+            ###
+            
+            plt.tight_layout()
+            
+            plt.savefig(filename + '.' + fmt, dpi=dpi)
+            
+            if display is True:
+                plt.show()
+            else:
+                plt.close(fig)
+            
+            return True
+    
+    return False
+
+
+def plot_dos(filenamedos, filename, titlestring, eV, fermienergy, fmt='png', display=True, dpi=None, rasterize=False):
+    'Plots DoS from a given .DOSS file, with the beta DoS of a spin-polarized file mirrored to negative values.'
+        
+    # Getting the band structure and DoS data
+        
+    dosfile = DosFile(filenamedos)
+    
+    dospoints = dosfile.points
+        
+    # Dealing with FermiEnergy and eV inputs - shifting, changing units and labels
+        
+    dosxaxis = convert_energies(dospoints[0], dosfile.efermi, eV, fermienergy)
+    FermiEnergy = float(convert_energies(0, dosfile.efermi, eV, fermienergy))
+    
+    dosxlabel = convert_energy_label(dosfile.xlabel, eV, fermienergy)
+    dosylabel = convert_energy_label(dosfile.ylabel, eV, fermienergy)
+    
+    # Plotting the Density of States
+    
+    fig = plt.figure(figsize=(4, 5))
+    
+    maxdosval = np.amax(dospoints[len(dospoints)-1])
+    minbetaval = 0
+    
+    if dosfile.beta is not None:
+        minbetaval = -np.amax(abs(dosfile.beta[-1]))
+    
+    plt.plot([minbetaval, maxdosval], [FermiEnergy, FermiEnergy], color ='red')
+    
+    plot_lines(plt.gca(), dospoints[1:], dosxaxis, rasterized=rasterize)
+    
+    if dosfile.beta is not None:
+        plot_lines(plt.gca(), -abs(dosfile.beta[1:]), convert_energies(dosfile.beta[0], dosfile.efermi, eV, fermienergy), rasterized=rasterize)
+    
+    dosxlimit = np.amax(dospoints[-1])
+    plt.xlim(np.floor(minbetaval), np.ceil(dosxlimit))
+    
+    plt.xlabel(dosylabel)
+    plt.ylabel(dosxlabel)
+    
+    if len(titlestring) > 0:
+        plt.title(titlestring)
+    else:
+        plt.title(dosfile.title)
+    
+    plt.tick_params(left = False)
+    
+    ###
+    
+    plt.savefig(filename + '.' + fmt, dpi=dpi)
+    
+    if display is True:
+        plt.show()
+    else:
+        plt.close(fig)
+
+
+def plot_compare(filenamesbs, filenamesdos, filename, titlestring, *, eV, fermienergy, fmt='png', display=True, window=None, labels=None, dpi=None, rasterize=False):
+    '''Overlays the band structures of several calculations on one set of axes, next to their densities of states if
+    filenamesdos is not empty. Energies are relative to each file's own Fermi energy, so the calculations are aligned
+    at E_F, unless fermienergy is True. k-paths are mapped onto the ticks of the first file (see align_kpath).
+    Every calculation gets its own colour and line style, named in the legend by labels or by the file names.
+    Raises ValueError unless labels (if given) and filenamesdos (if not empty) have one entry per .BAND file.
+    Beta bands of spin-polarized files are drawn dashed in the colour of their calculation, and beta DoS mirrored to negative values.
+    window keeps the bands within window eV of each Fermi energy. Files are read through open_file, so plotting
+    another subset of the same files does not read them again.'''
+    
+    if labels is None:
+        labels = [os.path.splitext(os.path.basename(name))[0] for name in filenamesbs]
+    
+    if len(labels) != len(filenamesbs):
+        raise ValueError('%d labels given for %d .BAND files' % (len(labels), len(filenamesbs)))
+    
+    if len(filenamesdos) not in [0, len(filenamesbs)]:
+        raise ValueError('%d .DOSS files given for %d .BAND files' % (len(filenamesdos), len(filenamesbs)))
+    
+    bsfiles = [open_file(BandFile, name) for name in filenamesbs]
+    dosfiles = [open_file(DosFile, name) for name in filenamesdos]
+    
+    colours = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    linestyles = ['solid', 'dashed', 'dotted', 'dashdot']
+    
+    if len(dosfiles) > 0:
+        fig, axes = plt.subplots(nrows = 1, ncols = 2, figsize=(8, 5), sharey=True)
+        fig.subplots_adjust(wspace=0)
+        bsaxes, dosaxes = axes
+        dosaxes.tick_params(left = False)
+    else:
+        fig = plt.figure(figsize=(4, 5))
+        bsaxes = plt.gca()
+    
+    reference = bsfiles[0].tick_positions
+    
+    # Band structures, one style per calculation
+    
+    for index, bsfile in enumerate(bsfiles):
+        rows = list(range(1, len(bsfile.points)))
+        if window is not None:
+            # A band is kept if either spin channel comes within the window, as in BandFile
+            rows = bands_in_window(bsfile.points, window)
+            if bsfile.beta is not None:
+                rows = sorted(set(rows) | set(bands_in_window(bsfile.beta, window)))
+        
+        bsxaxis = align_kpath(bsfile.points[0], bsfile.tick_positions, reference)
+        
+        plot_lines(bsaxes, bsxaxis, convert_energies(bsfile.points[rows], bsfile.efermi, eV, fermienergy), color=colours[index % len(colours)],
+                   linestyle=linestyles[index % len(linestyles)], label=labels[index], rasterized=rasterize)
+        
+        if bsfile.beta is not None:
+            plot_lines(bsaxes, bsxaxis, convert_energies(bsfile.beta[rows], bsfile.efermi, eV, fermienergy), color=colours[index % len(colours)],
+                       linestyle='dashed', rasterized=rasterize)
+        
+        if fermienergy is True:
+            bsaxes.axhline(float(convert_energies(0, bsfile.efermi, eV, fermienergy)), color=colours[index % len(colours)], linewidth=0.5)
+    
+    if fermienergy is False:
+        bsaxes.axhline(0, color ='red')
+    
+    for position in reference:
+        bsaxes.axvline(x = position, color=plt.rcParams['lines.color'])
+    
+    bsaxes.set_xlim(-0.01, np.amax(align_kpath(bsfiles[0].points[0], reference, reference)) + 0.01)
+    
+    set_kpath_ticks(bsaxes, reference, bsfiles[0].tick_labels)
+    
+    bsaxes.set_xlabel(bsfiles[0].xlabel)
+    bsaxes.set_ylabel(convert_energy_label(bsfiles[0].ylabel, eV, fermienergy))
+    bsaxes.legend(loc='upper right', fontsize='small')
+    
+    if len(titlestring) > 0:
+        bsaxes.set_title(titlestring)
+    else:
+        bsaxes.set_title('Band Structure')
+    
+    # Densities of states in the same styles
+    
+    for index, dosfile in enumerate(dosfiles):
+        dosenergies = convert_energies(dosfile.points[0], dosfile.efermi, eV, fermienergy)
+        plot_lines(dosaxes, dosfile.points[1:], dosenergies, color=colours[index % len(colours)], linestyle=linestyles[index % len(linestyles)], rasterized=rasterize)
+        
+        if dosfile.beta is not None:
+            plot_lines(dosaxes, -abs(dosfile.beta[1:]), convert_energies(dosfile.beta[0], dosfile.efermi, eV, fermienergy), color=colours[index % len(colours)],
+                       linestyle=linestyles[index % len(linestyles)], rasterized=rasterize)
+    
+    if len(dosfiles) > 0:
+        minbetaval = -np.amax([np.amax(abs(dosfile.beta[1:])) for dosfile in dosfiles if dosfile.beta is not None], initial=0)
+        dosaxes.set_xlim(np.floor(minbetaval), np.ceil(np.amax([np.amax(dosfile.points[1:]) for dosfile in dosfiles])))
+        dosaxes.set_xlabel(convert_energy_label(dosfiles[0].ylabel, eV, fermienergy))
+        dosaxes.set_title(dosfiles[0].title)
+    
+    plt.tight_layout()
+    
+    plt.savefig(filename + '.' + fmt, dpi=dpi)
+    
+    if display is True:
+        plt.show()
+    else:
+        plt.close(fig)
@@ -0,0 +1,91 @@
+'NumPy transformations of parsed band data for drawing: level-of-detail decimation and mapping k-paths onto each other.'
+
+import numpy as np
+
+
+def decimate_bands(xaxis, energies, nbuckets):
+    '''Reduces bands with more k-points than can be shown to at most four points per bucket of about one pixel:
+    the first, lowest, highest and last point of each band within the bucket, so extrema and crossings survive.
+    xaxis has shape (n_points,) and energies (n_bands, n_points). Returns (x, y), both of shape (n_bands, n_kept),
+    or the inputs unchanged if there are no more than 4 * nbuckets points. Raises ValueError if nbuckets is below 1.'''
+    
+    if nbuckets < 1:
+        raise ValueError('decimation needs at least one bucket, not %d' % nbuckets)
+    
+    energies = np.asarray(energies)
+    npoints = len(xaxis)
+    
+    if npoints <= 4 * nbuckets or len(energies) == 0:
+        return xaxis, energies
+    
+    size = int(np.ceil(npoints / nbuckets))
+    nbuckets = int(np.ceil(npoints / size))
+    
+    # Padding with the last point keeps every bucket the same size; padded indices are clipped back below
+    padded = np.pad(energies, ((0, 0), (0, nbuckets * size - npoints)), mode='edge').reshape(len(energies), nbuckets, size)
+    starts = np.arange(nbuckets) * size
+    
+    indices = np.stack(np.broadcast_arrays(starts, starts + np.argmin(padded, axis=2), starts + np.argmax(padded, axis=2), starts + size - 1), axis=2)
+    indices = np.minimum(np.sort(indices, axis=2).reshape(len(energies), 4 * nbuckets), npoints - 1)
+    
+    return np.asarray(xaxis)[indices], np.take_along_axis(energies, indices, axis=1)
+
+
+def align_kpath(xaxis, tick_positions, reference):
+    '''Maps a k-distance axis onto the tick positions of another calculation, so paths through the same points of
+    different cells (e.g. a strain series) line up. Each segment between ticks is stretched linearly; if the number
+    of ticks differs, the whole path is scaled to the length of the reference instead.'''
+    
+    if len(tick_positions) == len(reference) and len(reference) > 1:
+        return np.interp(xaxis, tick_positions, reference)
+    
+    if len(reference) > 1 and np.amax(xaxis) > 0:
+        return xaxis * (reference[-1] / np.amax(xaxis))
+    
+    return xaxis
+
+
+def reconnect_bands(points, tick_positions=()):
+    '''Reorders .BAND points (column 0 the k-distance, the rest bands in energy order at every k-point) into smooth
+    branches that run through band crossings instead of bouncing off them. Within every segment between the tick
+    positions of get_bs_labels/BandFile, the value of each branch at the next k-point is predicted by extending its
+    last step linearly, and the predictions are matched to the energies there in order, which keeps the slopes
+    continuous. Row n of the result is the branch that starts as the n-th lowest band; the energies at every k-point are unchanged.
+    Without eigenvectors, bands that approach without crossing (avoided crossings) are also passed through.'''
+    
+    points = np.asarray(points)
+    energies = np.sort(points[1:], axis=0).T
+    nkpoints, nbands = energies.shape
+    
+    if nkpoints < 3 or nbands < 2:
+        return points.copy()
+    
+    kpoints = points[0]
+    steps = np.diff(kpoints)
+    
+    # Step j predicts k-point j from j-1 and j-2, unless a tick lies between them, where the slope may jump
+    ticks = np.sort(np.asarray(tick_positions, dtype=float))
+    low = kpoints[:-2] + steps[:-1] / 2
+    high = kpoints[2:] - steps[1:] / 2
+    breaks = np.searchsorted(ticks, high, side='right') > np.searchsorted(ticks, low, side='left')
+    
+    ratios = np.zeros(nkpoints)
+    predicted = ~breaks & (steps[:-1] > 0)
+    ratios[2:][predicted] = steps[1:][predicted] / steps[:-1][predicted]
+    
+    # Each step depends on the branches found at the step before, so the k-points are swept in order, with every
+    # step vectorised over the bands: one argsort per k-point, which scales linearly in both dimensions
+    branches = np.empty((nkpoints, nbands))
+    branches[:2] = energies[:2]
+    
+    for index in range(2, nkpoints):
+        last = branches[index - 1]
+        guesses = last + (last - branches[index - 2]) * ratios[index]
+        
+        # The lowest prediction takes the lowest energy and so on, the best match of two sets of numbers on a line
+        branches[index, np.argsort(guesses, kind='stable')] = energies[index]
+    
+    reconnected = points.copy()
+    reconnected[1:] = branches.T
+    
+    return reconnected
@@ -0,0 +1,295 @@
+'''Local browser viewer for big band structures and densities of states. The parsed arrays stay in memory in a small
+HTTP server, and every zoom or pan fetches only the decimated slice of the visible k and energy window.'''
+
+import json
+import webbrowser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .energy import convert_energies, convert_energy_label
+from .parse import BandFile, DosFile, open_file
+from .transform import decimate_bands
+
+
+class ViewerData:
+    '''The band and DoS arrays served by the viewer, converted once to the plotted energy units (relative to the Fermi
+    level, in eV if eV is True) and sliced on request. doss may be None.'''
+
+    def __init__(self, band, doss=None, eV=True):
+        bsfile = open_file(BandFile, band)
+
+        self.title = bsfile.title
+        self.tick_labels = list(bsfile.tick_labels)
+        self.tick_positions = list(bsfile.tick_positions)
+        self.ylabel = convert_energy_label(bsfile.ylabel, eV, False)
+
+        self.kpoints = np.asarray(bsfile.points[0])
+        self.bands = convert_energies(np.asarray(bsfile.points[1:]), bsfile.efermi, eV, False)
+        self.beta = None if bsfile.beta is None else convert_energies(np.asarray(bsfile.beta[1:]), bsfile.efermi, eV, False)
+
+        self.dosenergies = self.dos = self.dosbeta = None
+
+        if doss is not None:
+            dosfile = open_file(DosFile, doss)
+            self.dosenergies = convert_energies(np.asarray(dosfile.points[0]), dosfile.efermi, eV, False)
+            self.dos = np.asarray(dosfile.points[1:])
+            self.dosbeta = None if dosfile.beta is None else -np.abs(dosfile.beta[1:])
+
+    def meta(self):
+        'The labels, ticks and full data ranges the page starts from.'
+
+        energies = [self.bands] + ([] if self.beta is None else [self.beta])
+
+        meta = {'title': self.title, 'ylabel': self.ylabel, 'tick_labels': self.tick_labels, 'tick_positions': self.tick_positions,
+                'kmin': float(self.kpoints[0]), 'kmax': float(self.kpoints[-1]),
+                'emin': float(min(np.amin(values) for values in energies)), 'emax': float(max(np.amax(values) for values in energies)),
+                'nbands': len(self.bands), 'nkpoints': len(self.kpoints), 'dos': self.dos is not None}
+
+        if self.dos is not None:
+            meta['dosmin'] = 0.0 if self.dosbeta is None else float(np.amin(self.dosbeta))
+            meta['dosmax'] = float(np.amax(self.dos))
+
+        return meta
+
+    def band_slice(self, kmin, kmax, emin, emax, width):
+        '''The bands that pass through the window [kmin, kmax] x [emin, emax], cut to the k-points in it (plus one either
+        side, so lines reach the edges) and decimated to width buckets. Returns the energies of every band in 'alpha' and
+        'beta', and their k-distances in 'alpha_x' and 'beta_x': one list per band, or a single list shared by every band.'''
+
+        start = max(int(np.searchsorted(self.kpoints, kmin, 'left')) - 1, 0)
+        stop = min(int(np.searchsorted(self.kpoints, kmax, 'right')) + 1, len(self.kpoints))
+        kpoints = self.kpoints[start:stop]
+
+        result = {'alpha': [], 'alpha_x': [], 'beta': [], 'beta_x': []}
+
+        for channel, energies in [('alpha', self.bands), ('beta', self.beta)]:
+            if energies is None or len(kpoints) == 0:
+                continue
+
+            visible = energies[:, start:stop]
+            visible = visible[(np.amax(visible, axis=1) >= emin) & (np.amin(visible, axis=1) <= emax)]
+
+            x, y = decimate_bands(kpoints, visible, max(width, 1))
+
+            result[channel] = np.round(y, 6).tolist()
+            result[channel + '_x'] = np.round(np.atleast_2d(x), 6).tolist()
+
+        return result
+
+    def dos_slice(self, emin, emax, height):
+        '''The DoS projections at the energies in [emin, emax] (plus one either side), decimated to height buckets along
+        the energy axis. Returns the DoS of every projection in 'alpha' and 'beta' (mirrored to negative values), and
+        their energies in 'alpha_energies' and 'beta_energies': one list per projection, or a single shared list.'''
+
+        result = {'alpha': [], 'alpha_energies': [], 'beta': [], 'beta_energies': []}
+
+        if self.dos is None:
+            return result
+
+        start = max(int(np.searchsorted(self.dosenergies, emin, 'left')) - 1, 0)
+        stop = min(int(np.searchsorted(self.dosenergies, emax, 'right')) + 1, len(self.dosenergies))
+        energies = self.dosenergies[start:stop]
+
+        for channel, dos in [('alpha', self.dos), ('beta', self.dosbeta)]:
+            if dos is None or len(energies) == 0:
+                continue
+
+            e, values = decimate_bands(energies, dos[:, start:stop], max(height, 1))
+            result[channel] = np.round(values, 6).tolist()
+            result[channel + '_energies'] = np.round(np.atleast_2d(e), 6).tolist()
+
+        return result
+
+
+page = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Band structure viewer</title>
+<style>body{margin:0;font:13px sans-serif}#plots{display:flex;height:calc(100vh - 24px)}canvas{flex:3;width:0}#dos{flex:1}#status{height:24px;line-height:24px;padding:0 8px}</style>
+</head><body><div id="plots"><canvas id="bands"></canvas><canvas id="dos"></canvas></div>
+<div id="status">Scroll to zoom (shift: energy only, ctrl: k only), drag to pan, double-click to reset.</div>
+<script>
+const colours = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+const pad = {left: 60, right: 10, top: 24, bottom: 40};
+let meta, view, request = 0, bandData = null, dosData = null;
+
+function canvasSize(canvas) {
+  canvas.width = canvas.clientWidth; canvas.height = canvas.clientHeight;
+  return [canvas.width - pad.left - pad.right, canvas.height - pad.top - pad.bottom];
+}
+
+function axes(ctx, width, height, title) {
+  ctx.strokeStyle = '#000'; ctx.strokeRect(pad.left, pad.top, width, height);
+  ctx.fillStyle = '#000'; ctx.textAlign = 'center'; ctx.fillText(title, pad.left + width / 2, 16);
+}
+
+function energyTicks(ctx, width, height) {
+  const span = view.emax - view.emin, step = Math.pow(10, Math.floor(Math.log10(span / 5)));
+  ctx.textAlign = 'right';
+  for (let e = Math.ceil(view.emin / step) * step; e <= view.emax; e += step) {
+    const y = pad.top + height * (view.emax - e) / span;
+    ctx.fillText(e.toPrecision(3), pad.left - 4, y + 4);
+  }
+}
+
+function drawLines(ctx, xs, ys, colour, dashed, toX, toY) {
+  ctx.strokeStyle = colour; ctx.setLineDash(dashed ? [5, 4] : []); ctx.beginPath();
+  ys.forEach((y, line) => { const x = xs[line] || xs[0]; y.forEach((value, i) => i ? ctx.lineTo(toX(x[i]), toY(value)) : ctx.moveTo(toX(x[i]), toY(value))); });
+  ctx.stroke(); ctx.setLineDash([]);
+}
+
+function draw() {
+  const canvas = document.getElementById('bands'), ctx = canvas.getContext('2d'), [width, height] = canvasSize(canvas);
+  const toX = k => pad.left + width * (k - view.kmin) / (view.kmax - view.kmin);
+  const toY = e => pad.top + height * (view.emax - e) / (view.emax - view.emin);
+  axes(ctx, width, height, meta.title || 'Band Structure'); energyTicks(ctx, width, height);
+  ctx.save(); ctx.beginPath(); ctx.rect(pad.left, pad.top, width, height); ctx.clip();
+  if (bandData) {
+    drawLines(ctx, bandData.alpha_x, bandData.alpha, '#000', false, toX, toY);
+    drawLines(ctx, bandData.beta_x, bandData.beta, colours[0], true, toX, toY);
+  }
+  drawLines(ctx, [[view.kmin, view.kmax]], [[0, 0]], 'red', false, toX, toY);
+  ctx.strokeStyle = '#1f77b4';
+  meta.tick_positions.forEach(k => { ctx.beginPath(); ctx.moveTo(toX(k), pad.top); ctx.lineTo(toX(k), pad.top + height); ctx.stroke(); });
+  ctx.restore();
+  ctx.textAlign = 'center';
+  meta.tick_positions.forEach((k, i) => { if (k >= view.kmin && k <= view.kmax) ctx.fillText(meta.tick_labels[i], toX(k), pad.top + height + 16); });
+  ctx.save(); ctx.translate(14, pad.top + height / 2); ctx.rotate(-Math.PI / 2); ctx.fillText(meta.ylabel, 0, 0); ctx.restore();
+
+  const dcanvas = document.getElementById('dos'), dctx = dcanvas.getContext('2d'), [dwidth] = canvasSize(dcanvas);
+  if (!meta.dos) return;
+  const toD = value => pad.left + dwidth * (value - meta.dosmin) / (meta.dosmax - meta.dosmin);
+  axes(dctx, dwidth, height, 'Density of States');
+  dctx.save(); dctx.beginPath(); dctx.rect(pad.left, pad.top, dwidth, height); dctx.clip();
+  if (dosData) {
+    ['alpha', 'beta'].forEach(channel => dosData[channel].forEach((values, i) =>
+      drawLines(dctx, [values], [dosData[channel + '_energies'][i] || dosData[channel + '_energies'][0]], colours[i % colours.length], false, toD, toY)));
+  }
+  drawLines(dctx, [[meta.dosmin, meta.dosmax]], [[0, 0]], 'red', false, toD, toY);
+  dctx.restore();
+}
+
+async function refresh() {
+  const id = ++request, canvas = document.getElementById('bands');
+  const query = `kmin=${view.kmin}&kmax=${view.kmax}&emin=${view.emin}&emax=${view.emax}`;
+  const [bands, dos] = await Promise.all([
+    fetch(`bands?${query}&width=${canvas.clientWidth}`).then(r => r.json()),
+    meta.dos ? fetch(`dos?${query}&height=${canvas.clientHeight}`).then(r => r.json()) : null]);
+  if (id !== request) return;
+  bandData = bands; dosData = dos; draw();
+}
+
+function reset() {
+  const margin = 0.05 * (meta.emax - meta.emin);
+  view = {kmin: meta.kmin, kmax: meta.kmax, emin: meta.emin - margin, emax: meta.emax + margin};
+  refresh();
+}
+
+function zoom(event) {
+  event.preventDefault();
+  const canvas = document.getElementById('bands'), factor = event.deltaY > 0 ? 1.25 : 0.8;
+  const fx = (event.offsetX - pad.left) / (canvas.width - pad.left - pad.right), fy = (event.offsetY - pad.top) / (canvas.height - pad.top - pad.bottom);
+  if (!event.shiftKey && event.target === canvas) {
+    const k = view.kmin + fx * (view.kmax - view.kmin);
+    view.kmin = k - (k - view.kmin) * factor; view.kmax = k + (view.kmax - k) * factor;
+  }
+  if (!event.ctrlKey) {
+    const e = view.emax - fy * (view.emax - view.emin);
+    view.emin = e - (e - view.emin) * factor; view.emax = e + (view.emax - e) * factor;
+  }
+  draw(); refresh();
+}
+
+let drag = null;
+function pan(event) {
+  if (!drag) return;
+  const canvas = document.getElementById('bands');
+  const dk = (event.clientX - drag.x) / (canvas.width - pad.left - pad.right) * (drag.view.kmax - drag.view.kmin);
+  const de = (event.clientY - drag.y) / (canvas.height - pad.top - pad.bottom) * (drag.view.emax - drag.view.emin);
+  view = {kmin: drag.view.kmin - (drag.target === canvas ? dk : 0), kmax: drag.view.kmax - (drag.target === canvas ? dk : 0),
+          emin: drag.view.emin + de, emax: drag.view.emax + de};
+  draw(); refresh();
+}
+
+fetch('meta').then(r => r.json()).then(data => {
+  meta = data;
+  document.title = meta.title || document.title;
+  document.getElementById('dos').style.display = meta.dos ? '' : 'none';
+  ['bands', 'dos'].forEach(id => {
+    const canvas = document.getElementById(id);
+    canvas.addEventListener('wheel', zoom);
+    canvas.addEventListener('mousedown', event => drag = {x: event.clientX, y: event.clientY, view: {...view}, target: canvas});
+    canvas.addEventListener('dblclick', reset);
+  });
+  window.addEventListener('mousemove', pan);
+  window.addEventListener('mouseup', () => drag = null);
+  window.addEventListener('resize', refresh);
+  reset();
+});
+</script></body></html>
+'''
+
+
+class ViewerHandler(BaseHTTPRequestHandler):
+    'Serves the page and the meta, bands and dos JSON endpoints from the ViewerData in server.data.'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        data = self.server.data
+
+        try:
+            if url.path == '/':
+                self.send(page.encode(), 'text/html; charset=utf-8')
+                return
+
+            elif url.path == '/meta':
+                result = data.meta()
+
+            elif url.path == '/bands':
+                result = data.band_slice(float(query['kmin']), float(query['kmax']), float(query['emin']), float(query['emax']), int(query.get('width', 800)))
+
+            elif url.path == '/dos':
+                result = data.dos_slice(float(query['emin']), float(query['emax']), int(query.get('height', 600)))
+
+            else:
+                self.send_error(404)
+                return
+
+        except (KeyError, ValueError) as error:
+            self.send_error(400, '%s: %s' % (type(error).__name__, error))
+            return
+
+        self.send(json.dumps(result).encode(), 'application/json')
+
+    def send(self, body, contenttype):
+        'Sends a complete 200 response.'
+
+        self.send_response(200)
+        self.send_header('Content-Type', contenttype)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(band, doss=None, host='127.0.0.1', port=8000, eV=True, browser=False):
+    'Loads the files and serves the viewer until interrupted.'
+
+    server = ThreadingHTTPServer((host, port), ViewerHandler)
+    server.data = ViewerData(band, doss, eV)
+
+    url = 'http://%s:%d/' % (host, server.server_address[1])
+    print('Serving', band, 'at', url)
+
+    if browser is True:
+        webbrowser.open(url)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,28 @@
+'Shared fixtures: synthetic .BAND/.DOSS files written by benchmarks/synthetic.py.'
+
+import os
+import sys
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'benchmarks'))
+
+from synthetic import write_band, write_doss
+
+
+@pytest.fixture
+def band_file(tmp_path):
+    'A small .BAND file with 8 bands on 201 k-points.'
+    filename = str(tmp_path / 'synthetic.BAND')
+    write_band(filename, 8, 201)
+    return filename
+
+
+@pytest.fixture
+def doss_file(tmp_path):
+    'A small .DOSS file with 3 projections on 301 energies.'
+    filename = str(tmp_path / 'synthetic.DOSS')
+    write_doss(filename, 3, 301)
+    return filename
@@ -0,0 +1,109 @@
+'Band gaps, Fermi level crossings and effective masses of analytic band structures.'
+
+import numpy as np
+import pytest
+
+from msrhpc.analysis import analyse_bands, edge_masses, effective_masses, fermi_crossings
+from msrhpc.energy import HARTREE_TO_EV
+
+kpoints = np.linspace(0, 2, 201)
+
+
+def two_parabolas():
+    'A valence band with mass -0.5 peaking at k = 1 and a conduction band with mass 2 bottoming out at k = 0.5.'
+    valence = -0.1 - (kpoints - 1) ** 2
+    conduction = 0.1 + 0.25 * (kpoints - 0.5) ** 2
+    return np.vstack((kpoints, valence, conduction))
+
+
+def test_indirect_gap():
+    results = analyse_bands(two_parabolas())
+
+    assert results['metallic'] is False
+    assert results['gap'] == pytest.approx(0.2)
+    assert results['direct'] is False
+    assert results['vbm'] == pytest.approx(-0.1)
+    assert results['cbm'] == pytest.approx(0.1)
+    assert (results['vbm_band'], results['cbm_band']) == (1, 2)
+    assert results['vbm_k'] == pytest.approx(1.0)
+    assert results['cbm_k'] == pytest.approx(0.5)
+    assert results['crossings'] == []
+
+
+def test_direct_gap_in_eV_with_band_numbers():
+    points = np.vstack((kpoints, -0.1 - (kpoints - 1) ** 2, 0.3 + (kpoints - 1) ** 2))
+
+    results = analyse_bands(points, bands=[7, 8], eV=True)
+
+    assert results['direct'] is True
+    assert results['gap'] == pytest.approx(0.4 * HARTREE_TO_EV)
+    assert (results['vbm_band'], results['cbm_band']) == (7, 8)
+    assert results['vbm_k'] == results['cbm_k'] == pytest.approx(1.0)
+    assert results['widths'] == pytest.approx([HARTREE_TO_EV, HARTREE_TO_EV])
+
+
+def test_metal_crossings_are_interpolated():
+    coarse = np.linspace(0, 2, 5)
+    points = np.vstack((coarse, coarse - 0.8, 1.3 - coarse, coarse - 3))
+
+    results = analyse_bands(points)
+
+    assert results['metallic'] is True
+    assert results['gap'] == 0.0
+    assert results['direct'] is None
+    assert results['crossing_bands'] == [1, 2]
+    assert [band for band, k in results['crossings']] == [1, 2]
+    assert [k for band, k in results['crossings']] == pytest.approx([0.8, 1.3])
+    assert results['vbm_band'] == 3
+    assert results['cbm_band'] is None
+
+
+def test_fermi_crossings_of_a_band_crossing_twice():
+    band, k = fermi_crossings(kpoints, np.array([0.25 - (kpoints - 1) ** 2]))
+
+    assert band.tolist() == [0, 0]
+    np.testing.assert_allclose(k, [0.5, 1.5], atol=1e-4)
+
+
+def test_effective_masses_per_segment():
+    fits = effective_masses(two_parabolas(), [0, 0.75, 2])
+
+    assert fits['kinds'].tolist() == ['max', 'min']
+    np.testing.assert_allclose(fits['mass'][:, 0], [-0.5, -0.5])
+    np.testing.assert_allclose(fits['mass'][:, 1], [2.0, 2.0])
+    np.testing.assert_allclose(fits['k'], [[0.75, 0.5], [1.0, 0.75]])
+    np.testing.assert_allclose(fits['residual'], 0, atol=1e-12)
+    assert fits['segments'] == pytest.approx([(0, 0.75), (0.75, 2)])
+
+
+def test_effective_masses_of_short_segments_are_nan():
+    fits = effective_masses(two_parabolas(), [0, 0.02, 2])
+
+    assert np.all(np.isnan(fits['mass'][0]))
+    assert np.all(np.isfinite(fits['mass'][1]))
+
+
+def test_edge_masses():
+    points = two_parabolas()
+    results = analyse_bands(points)
+
+    masses = edge_masses(points, [0, 2], results)
+
+    assert masses['vbm_mass'] == pytest.approx(-0.5)
+    assert masses['cbm_mass'] == pytest.approx(2.0)
+    assert masses['vbm_mass_residual'] == pytest.approx(0, abs=1e-12)
+
+
+def test_edge_masses_of_spin_channels():
+    alpha = two_parabolas()
+    beta = np.vstack((kpoints, -0.05 - 2 * (kpoints - 1) ** 2, 0.3 + (kpoints - 1) ** 2))
+    points = np.vstack((alpha, beta[1:]))
+    spins = ['alpha', 'alpha', 'beta', 'beta']
+
+    results = analyse_bands(points, bands=[1, 2, 1, 2], spins=spins)
+    masses = edge_masses(points, [0, 2], results, bands=[1, 2, 1, 2], spins=spins)
+
+    assert (results['vbm_spin'], results['cbm_spin']) == ('beta', 'alpha')
+    assert results['gap'] == pytest.approx(0.15)
+    assert masses['vbm_mass'] == pytest.approx(-0.25)
+    assert masses['cbm_mass'] == pytest.approx(2.0)
@@ -0,0 +1,80 @@
+'Round trips of parsed .BAND/.DOSS data through NPZ and HDF5 archives.'
+
+import numpy as np
+import pytest
+
+from bs_dos_archive import main
+from msrhpc import BandFile, DosFile
+from msrhpc.archive import read_archive, write_archive
+
+
+def assert_same(original, restored):
+    np.testing.assert_array_equal(original.points, restored.points)
+    assert restored.efermi == original.efermi
+    assert restored.header() == original.header()
+
+
+def test_npz_round_trip(tmp_path, band_file, doss_file):
+    bsfile = BandFile(band_file, cache=False)
+    dosfile = DosFile(doss_file, cache=False)
+
+    archive = str(tmp_path / 'archive.npz')
+    write_archive(archive, bsfile, dosfile)
+    restored_bs, restored_dos = read_archive(archive)
+
+    assert_same(bsfile, restored_bs)
+    assert_same(dosfile, restored_dos)
+    assert restored_bs.tick_labels == bsfile.tick_labels
+
+
+def test_npz_band_selection(tmp_path, band_file):
+    bsfile = BandFile(band_file, cache=False)
+
+    archive = str(tmp_path / 'archive.npz')
+    write_archive(archive, bsfile)
+    restored, dosfile = read_archive(archive, bands=[5, 2])
+
+    assert dosfile is None
+    assert restored.bands == [5, 2]
+    np.testing.assert_array_equal(restored.points, bsfile.points[[0, 5, 2]])
+
+
+def test_unknown_extension_is_rejected(tmp_path, band_file):
+    output = tmp_path / 'archive.arch'
+
+    with pytest.raises(ValueError):
+        write_archive(str(output), BandFile(band_file, cache=False))
+
+    assert main(['export', band_file, '-o', str(output)]) == 1
+    assert list(tmp_path.glob('archive.arch*')) == []
+
+
+def test_hdf5_round_trip_and_row_chunks(tmp_path, band_file, doss_file):
+    h5py = pytest.importorskip('h5py')
+
+    bsfile = BandFile(band_file, cache=False)
+    dosfile = DosFile(doss_file, cache=False)
+
+    archive = str(tmp_path / 'archive.h5')
+    write_archive(archive, bsfile, dosfile, chunk=64)
+
+    with h5py.File(archive, 'r') as stream:
+        assert stream['band/points'].chunks == (1, 64)
+        assert stream['dos/points'].chunks == (1, 64)
+
+    restored_bs, restored_dos = read_archive(archive)
+    assert_same(bsfile, restored_bs)
+    assert_same(dosfile, restored_dos)
+
+    selected, _ = read_archive(archive, bands=[3, 1], projections=[2])
+    np.testing.assert_array_equal(selected.points, bsfile.points[[0, 3, 1]])
+
+
+def test_hdf5_default_chunks_are_rows(tmp_path, band_file):
+    h5py = pytest.importorskip('h5py')
+
+    archive = str(tmp_path / 'archive.hdf5')
+    write_archive(archive, BandFile(band_file, cache=False), compress=False)
+
+    with h5py.File(archive, 'r') as stream:
+        assert stream['band/points'].chunks == (1, 201)
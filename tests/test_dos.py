@@ -0,0 +1,34 @@
+'DoS analysis of closed shell and spin-polarized .DOSS files.'
+
+import numpy as np
+import pytest
+
+from msrhpc.dos import analyse_dos_file
+
+
+def write_spin_doss(filename):
+    'Flat alpha and beta DoS of 1 and 2 states per Hartree on [-1, 1], the beta block written as negative values.'
+    energies = np.linspace(-1, 1, 21)
+    with open(filename, 'w') as stream:
+        stream.write('# EFERMI (HARTREE):  0.000000\n')
+        np.savetxt(stream, np.vstack((energies, np.ones_like(energies))).T, fmt='%12.6f')
+        stream.write('\n')
+        np.savetxt(stream, np.vstack((energies, -2 * np.ones_like(energies))).T, fmt='%12.6f')
+
+
+def test_closed_shell_rows(doss_file):
+    rows = analyse_dos_file(doss_file)
+
+    assert [row['projection'] for row in rows] == [1, 2, 3]
+    assert [row['spin'] for row in rows] == [None, None, None]
+
+
+def test_both_spin_channels_are_reported(tmp_path):
+    filename = str(tmp_path / 'spin.DOSS')
+    write_spin_doss(filename)
+
+    rows = analyse_dos_file(filename)
+
+    assert [(row['projection'], row['spin']) for row in rows] == [(1, 'alpha'), (1, 'beta')]
+    assert [row['electrons'] for row in rows] == pytest.approx([1.0, 2.0])
+    assert [row['centre'] for row in rows] == pytest.approx([0.0, 0.0], abs=1e-12)
@@ -0,0 +1,30 @@
+'Finding .BAND/.DOSS pairs and naming their figures.'
+
+import os
+
+from msrhpc import figure_stem, find_bs_dos_pairs, search_root
+
+
+def test_outdir_keeps_relative_paths(tmp_path):
+    for directory in ['strain1', 'strain2']:
+        (tmp_path / directory).mkdir()
+        for extension in ['.BAND', '.DOSS']:
+            (tmp_path / directory / ('calc' + extension)).write_text('')
+
+    pairs = find_bs_dos_pairs([str(tmp_path)])
+    root = search_root([str(tmp_path)])
+    stems = [figure_stem(band, 'out', root) for band, doss in pairs]
+
+    assert stems == [os.path.join('out', 'strain1', 'calc'), os.path.join('out', 'strain2', 'calc')]
+
+
+def test_search_root_of_patterns_and_files(tmp_path):
+    (tmp_path / 'a').mkdir()
+
+    assert search_root([str(tmp_path / 'a' / '*' / 'calc.BAND')]) == str(tmp_path / 'a')
+    assert search_root([str(tmp_path / 'a' / 'calc.BAND'), str(tmp_path / 'b.BAND')]) == str(tmp_path)
+
+
+def test_figure_beside_band_without_outdir():
+    assert figure_stem(os.path.join('runs', 'calc.BAND')) == os.path.join('runs', 'calc')
+    assert figure_stem(os.path.join('runs', 'calc.BAND'), 'out') == os.path.join('out', 'calc')
@@ -0,0 +1,67 @@
+'Parsing of .BAND/.DOSS files: band selection and spin blocks.'
+
+import io
+
+import numpy as np
+
+from msrhpc import BandFile
+from msrhpc.parse import read_blocks
+
+
+def shapes(text, **options):
+    return [block.shape for block in read_blocks(io.StringIO(text), **options)]
+
+
+def test_blocks_split_at_blank_ampersand_and_comment_lines():
+    for separator in ['\n', '&\n', '@ TITLE\n', '# BETA\n']:
+        text = '0 1 2\n1 3 4\n' + separator + '2 5 6\n3 7 8\n'
+        assert shapes(text) == [(3, 2), (3, 2)]
+
+
+def test_leading_and_repeated_separators_give_no_empty_blocks():
+    headers = []
+    text = '# NPROJ\n@ LABEL\n0 1\n1 2\n\n&\n\n0 3\n1 4\n\n'
+
+    blocks = read_blocks(io.StringIO(text), header=headers.append)
+
+    assert [block.tolist() for block in blocks] == [[[0, 1], [1, 2]], [[0, 1], [3, 4]]]
+    assert headers == ['# NPROJ\n', '@ LABEL\n']
+
+
+def test_blocks_split_where_column_0_restarts():
+    text = '0 1\n1 2\n2 3\n0 4\n1 5\n2 6\n'
+
+    blocks = read_blocks(io.StringIO(text))
+
+    assert [block[1].tolist() for block in blocks] == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_restarts_at_and_across_chunk_boundaries():
+    text = '0 1\n1 2\n2 3\n0 4\n1 5\n2 6\n'
+
+    for chunksize in [1, 2, 3, 4, 5]:
+        blocks = read_blocks(io.StringIO(text), chunksize=chunksize)
+        assert [block[1].tolist() for block in blocks] == [[1, 2, 3], [4, 5, 6]], chunksize
+
+
+def test_selected_columns_without_column_0_do_not_split_at_restarts():
+    text = '0 1 2\n1 3 4\n0 5 6\n1 7 8\n\n0 9 10\n'
+
+    blocks = read_blocks(io.StringIO(text), columns=[2, 1], chunksize=3)
+
+    assert [block.tolist() for block in blocks] == [[[2, 4, 6, 8], [1, 3, 5, 7]], [[10], [9]]]
+
+
+def test_selected_columns_with_column_0_first_split_at_restarts():
+    text = '0 1 2\n1 3 4\n0 5 6\n1 7 8\n'
+
+    assert shapes(text, columns=[0, 2]) == [(2, 2), (2, 2)]
+
+
+def test_window_within_selected_bands_keeps_band_numbers(band_file):
+    every = BandFile(band_file, cache=False)
+    inside = BandFile(band_file, cache=False, window=3.0).bands
+    selected = BandFile(band_file, cache=False, bands=[4, 5, 6, 7], window=3.0)
+
+    assert selected.bands == [band for band in inside if band in [4, 5, 6, 7]]
+    np.testing.assert_array_equal(selected.points, every.points[[0] + selected.bands])
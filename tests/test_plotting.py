@@ -0,0 +1,20 @@
+'Figures drawn headless with the Agg backend.'
+
+import pytest
+
+from msrhpc import plotting
+
+plotting.use_agg()
+
+
+def test_compare_needs_one_label_and_doss_per_band(tmp_path, band_file, doss_file):
+    output = str(tmp_path / 'compare')
+
+    with pytest.raises(ValueError):
+        plotting.plot_compare([band_file, band_file], [], output, '', eV=False, fermienergy=False, display=False, labels=['one'])
+
+    with pytest.raises(ValueError):
+        plotting.plot_compare([band_file, band_file], [doss_file], output, '', eV=False, fermienergy=False, display=False)
+
+    plotting.plot_compare([band_file, band_file], [doss_file, doss_file], output, '', eV=False, fermienergy=False, display=False, labels=['a', 'b'])
+    assert (tmp_path / 'compare.png').exists()
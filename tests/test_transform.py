@@ -0,0 +1,73 @@
+'Band reconnection through crossings, checked against a plain sequential reference.'
+
+import numpy as np
+
+from msrhpc import reconnect_bands
+
+
+def sequential_reference(points, tick_positions):
+    '''Reconnects one k-point and one branch at a time: each branch is extended along its last step (restarting at
+    the ticks), and the branches take the energies of the next k-point in the order of their predictions.'''
+
+    kpoints = [float(k) for k in points[0]]
+    energies = np.sort(points[1:], axis=0)
+    nbands = len(energies)
+
+    branches = [[float(energies[band, 0]), float(energies[band, 1])] for band in range(nbands)]
+
+    for index in range(2, len(kpoints)):
+        before, last, now = kpoints[index - 2:index + 1]
+        step = now - last
+        previous = last - before
+
+        # No prediction if the middle point is a tick or the previous step has zero length
+        tick = any(before + previous / 2 <= position <= now - step / 2 for position in tick_positions)
+        ratio = step / previous if previous > 0 and tick is False else 0.0
+
+        guesses = [branch[-1] + (branch[-1] - branch[-2]) * ratio for branch in branches]
+        order = sorted(range(nbands), key=lambda band: guesses[band])
+
+        for rank, band in enumerate(order):
+            branches[band].append(float(energies[rank, index]))
+
+    return np.vstack((points[0], np.array(branches)))
+
+
+def test_crossing_lines_are_recovered():
+    kpoints = np.linspace(0, 2, 401)
+    ticks = [0, 1.37, 2]
+    true = np.vstack([kpoints - 1, 1 - kpoints, 0.3 * np.ones_like(kpoints), (kpoints - 1) ** 2 - 0.5])
+    points = np.vstack((kpoints, np.sort(true, axis=0)))
+
+    reconnected = reconnect_bands(points, ticks)
+
+    np.testing.assert_allclose(reconnected[1:], true[np.argsort(true[:, 0])])
+
+
+def test_dense_crossings_match_sequential_reference():
+    generator = np.random.default_rng(0)
+    nbands, nkpoints = 60, 400
+    kpoints = np.linspace(0, 3, nkpoints)
+    ticks = [0.0, 1.0, 1.6, 2.2, 3.0]
+
+    centres = generator.uniform(-0.2, 0.2, (nbands, 1))
+    amplitudes = generator.uniform(-0.3, 0.3, (nbands, 1))
+    phases = generator.uniform(0, 2 * np.pi, (nbands, 1))
+    energies = centres + amplitudes * np.sin(2 * kpoints + phases) + generator.normal(0, 1e-3, (nbands, nkpoints))
+    points = np.vstack((kpoints, np.sort(energies, axis=0)))
+
+    reconnected = reconnect_bands(points, ticks)
+
+    np.testing.assert_array_equal(reconnected, sequential_reference(points, ticks))
+    np.testing.assert_array_equal(np.sort(reconnected[1:], axis=0), points[1:])
+
+
+def test_slope_restarts_at_ticks():
+    # Two bands that touch at a tick and fall away from each other: continuing the slopes would swap them there
+    kpoints = np.linspace(0, 2, 21)
+    lower = -np.abs(kpoints - 1)
+    upper = np.abs(kpoints - 1)
+    points = np.vstack((kpoints, lower, upper))
+
+    np.testing.assert_array_equal(reconnect_bands(points, [0, 1, 2]), points)
+    np.testing.assert_allclose(reconnect_bands(points, []), np.vstack((kpoints, kpoints - 1, 1 - kpoints)))